@@ -1,9 +1,16 @@
-import json
+import uuid
 
 import streamlit as st
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
-
-from utils.generic import *
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from utils.conversation_store import get_conversation_store
+from utils.generic import (
+    load_prompt_from_file,
+    message_text,
+    stream_chat_events,
+    trim_history,
+)
+from utils.rendering import page_css, render_movie_results, render_restaurant_results
 
 # Initialize Streamlit app configuration
 st.set_page_config(
@@ -13,189 +20,125 @@ st.set_page_config(
 # Header
 st.title("Restaurant and Movie Recommendation ChatBot 🤖")
 
+# Card styles are shared by every result list, so emit them once per page
+st.markdown(page_css(), unsafe_allow_html=True)
+
+
+def render_tool_result(tool_name, artifact):
+    """Render the result cards for one tool call from its structured artifact."""
+    if tool_name == "get_movie_recommendations":
+        st.markdown("### 🎞️ Recommended Movies")
+        st.markdown(
+            render_movie_results(artifact["recommendations"]),
+            unsafe_allow_html=True,
+        )
+    if tool_name == "restaurant_search":
+        st.markdown("### 🍴 Recommended Restaurants")
+        st.markdown(
+            render_restaurant_results(artifact),
+            unsafe_allow_html=True,
+        )
+
+
+# The session id lives in the URL, so a reload or a server restart resumes
+# the same conversation from the store.
+store = get_conversation_store()
+if "session_id" not in st.session_state:
+    st.session_state.session_id = st.query_params.get("session") or uuid.uuid4().hex
+    st.query_params["session"] = st.session_state.session_id
+session_id = st.session_state.session_id
+
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages, stored_messages = store.load(session_id)
+    if stored_messages:
+        st.session_state.chat_state = {"messages": stored_messages}
 
-# Iterate through the messages in session_state and display them.
+# Redraw every earlier turn, text and result cards alike, from stored data;
+# reruns never call the model or the APIs again.
 for message in st.session_state.messages:
     # Use st.chat_message to display messages, distinguishing between 'user' and 'assistant'.
     with st.chat_message(message["role"]):
         if message.get("type", "generic") == "generic":
             st.markdown(message["content"])
-
-def render_movie_card(movie):
-    """Returns the HTML string for a single movie card with poster image."""
-
-    title = movie["title"]
-    rating = movie["rating"]
-    language = movie["language"]
-    poster_img = movie["poster-img"]
-
-    return f"""
-        <div style="
-            border: 1px solid var(--border-color);
-            background-color: var(--secondary-background-color);
-            border-radius: 10px;
-            padding: 15px;
-            margin: 5px;
-            min-width: 250px;
-            max-width: 300px;
-            box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
-            display: flex;
-            flex-direction: column;
-            justify-content: space-between;
-            color: var(--text-color);
-        ">
-            <h4>🎬 {title}</h4>
-            <div style="
-                border-radius: 8px;
-                overflow: hidden;
-                margin-bottom: 10px;
-                text-align: center;
-            ">
-                <img src="{poster_img}" alt="{title} Poster" style="width: 100%; height: auto; display: block;">
-            </div>
-            <p style="margin: 4px 0;"><strong>⭐ Rating:</strong> {rating:.1f}</p>
-            <p style="margin: 4px 0;"><strong>🌎 Language:</strong> {language.upper()}</p>
-        </div>
-    """
-
-def render_restaurant_card(restaurant):
-    """Returns the HTML string for a single restaurant card, now with an interactive map using an iframe."""
-    print("Restaurant data:", restaurant)
-    # Build address from location components
-    location = restaurant["location"]
-    address = f"{location['address1']}, {location['city']}, {location['state']} {location['zip_code']}"
-
-    # The URL for Google Maps embeds
-    iframe_url = f"https://maps.google.com/maps?q={address}&output=embed"
-    maps_link = f"http://maps.google.com/?q={address}"
-
-    return f"""
-        <div style="
-            border: 1px solid var(--border-color);
-            background-color: var(--secondary-background-color);
-            border-radius: 10px;
-            padding: 15px;
-            margin: 5px;
-            min-width: 300px;
-            box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
-            display: flex;
-            flex-direction: column;
-            justify-content: space-between;
-        ">
-            <h4><a href="{maps_link}" target="_blank" style="text-decoration: none; color: var(--text-color);">{restaurant["name"]}</a></h4>
-            <div style="
-                border-radius: 8px;
-                overflow: hidden;
-                margin-top: 10px;
-                margin-bottom: 10px;
-            ">
-                <iframe
-                    src="{iframe_url}"
-                    style="border:0;"
-                    width="100%"
-                    height="150"
-                    allowfullscreen=""
-                    loading="lazy"
-                    referrerpolicy="no-referrer">
-                </iframe>
-            </div>
-            <p style="margin-top: 0; color: var(--text-color);"><strong>⭐ Rating:</strong> {restaurant.get("rating", "N/A")}</p>
-            <p style="color: var(--text-color);"><strong>📍 Address:</strong> {address}</p>
-            <p style="color: var(--text-color);"><strong>💰 Price:</strong> {restaurant.get("price", "N/A")}</p>
-            <p style="color: var(--text-color);"><strong>📞 Phone:</strong> {restaurant.get("display_phone", "N/A")}</p>
-            <p style="color: var(--text-color);"><strong>🍽️ Cuisine:</strong> {", ".join([cat["title"] for cat in restaurant.get("categories", [])])}</p>
-        </div>
-    """
-
+        else:
+            render_tool_result(message["type"], message["content"])
 
 def get_llm():
-    """Get or create LLM using session state"""
+    """Get the process-wide compiled graph shared by every session"""
     if "llm" not in st.session_state:
         with st.spinner("Initializing AI model..."):
-            st.session_state.llm = init_and_load_env()
-    return st.session_state.llm
+            # LangGraph, the Gemini client and the tools are the slowest imports
+            # in the app, so they load on the first message, not the first paint.
+            from utils.graph import get_shared_graph
 
+            st.session_state.llm = get_shared_graph()
+    return st.session_state.llm
 
-# In your main app code
-llm = get_llm()
 
 if "chat_state" not in st.session_state:
     base_prompt = load_prompt_from_file(r"static/prompts/base.txt")
     st.session_state.chat_state = {"messages": [SystemMessage(content=base_prompt)]}
 
 if prompt := st.chat_input("What's on your mind?"):
-    # st.session_state.messages.append({"role": "user", "content": prompt})
-    print("st.session_state.chat_state:", st.session_state.chat_state)
+    st.session_state.messages.append(store.append(session_id, "user", prompt))
     st.session_state.chat_state["messages"].append(HumanMessage(content=prompt))
     # Display the user message immediately
     st.chat_message("user").write(prompt)
 
+    llm = get_llm()
     with st.chat_message("assistant"):
         response_container = st.empty()
-        for chunk in llm.stream(st.session_state.chat_state):
-            # Generate response using the LLM
-            print("chunk:", chunk)
-            if chunk.get("chatbot"):
-                last_msg = chunk["chatbot"]["messages"][-1]
-                st.session_state.chat_state["messages"].append(last_msg)
-
-                # Display latest AI message
-                if isinstance(last_msg, AIMessage):
-                    response_container.write(last_msg.content)
-            elif chunk.get("tools"):
-                last_msg = chunk["tools"]["messages"][-1]
-                tool_name = last_msg.name
-                st.session_state.chat_state["messages"] = st.session_state.chat_state[
-                    "messages"
-                ][:1]
-                
-                # Display latest AI message
-                if tool_name == "get_movie_recommendations":
-                    st.markdown("### 🎞️ Recommended Movies")
-                    # Container for the horizontally scrolling cards
-                    movies = json.loads(last_msg.content)['recommendations']
-                    card_html = "".join(
-                        [render_movie_card(r) for r in movies]
-                    )
+        streamed_text = ""
+        # Running searches show their results so far, one slot per query,
+        # until the finished tool results replace them.
+        progress_slots = {}
+        for event, payload in stream_chat_events(llm, st.session_state.chat_state):
+            if event == "token":
+                # Render tokens as they arrive
+                streamed_text += payload
+                response_container.markdown(streamed_text + "▌")
+            elif event == "message":
+                st.session_state.chat_state["messages"].append(payload)
+
+                # Display the finished AI message and start a fresh buffer for
+                # the next model call in this turn
+                if isinstance(payload, AIMessage):
+                    text = message_text(payload)
+                    response_container.write(text)
+                    if text:
+                        st.session_state.messages.append(
+                            store.append(session_id, "assistant", text)
+                        )
+                streamed_text = ""
+            elif event == "progress":
+                slot = progress_slots.setdefault(payload["query"], st.empty())
+                with slot.container():
+                    st.markdown(f"### 🍴 Restaurants so far: {payload['query']}")
                     st.markdown(
-                        f"""
-                        <div style="
-                            display: flex;
-                            flex-direction: row;
-                            overflow-x: auto;
-                            padding: 10px 0;
-                            -webkit-overflow-scrolling: touch; /* For smoother scrolling on iOS */
-                            scrollbar-width: thin; /* For Firefox */
-                            scrollbar-color: #A9A9A9 #F1F0F0; /* For Firefox */
-                        ">
-                            {card_html}
-                        
-
-                        """,
+                        render_restaurant_results(payload["businesses"]),
                         unsafe_allow_html=True,
                     )
-                if tool_name == "restaurant_search":
-                    st.markdown("### 🍴 Recommended Restaurants")
-                    # Container for the horizontally scrolling cards
-                    restaurants = json.loads(last_msg.content)
-                    card_html = "".join(
-                        [render_restaurant_card(r) for r in restaurants]
-                    )
-                    st.markdown(
-                        f"""
-                        <div style="
-                            display: flex;
-                            flex-direction: row;
-                            overflow-x: auto;
-                            padding: 10px 0;
-                            -webkit-overflow-scrolling: touch; /* For smoother scrolling on iOS */
-                            scrollbar-width: thin; /* For Firefox */
-                            scrollbar-color: #A9A9A9 #F1F0F0; /* For Firefox */
-                        ">
-                            {card_html}
-
-                        """,
-                        unsafe_allow_html=True,
+            elif event == "tools":
+                for slot in progress_slots.values():
+                    slot.empty()
+                progress_slots.clear()
+                # Keep every tool result so the tool calls stay paired with
+                # their responses; `trim_history` compacts them on later turns.
+                st.session_state.chat_state["messages"].extend(payload)
+                for tool_msg in payload:
+                    # The full payload travels out-of-band as the message artifact;
+                    # the model only sees the compact projection in `content`.
+                    if tool_msg.artifact is None:
+                        continue
+                    render_tool_result(tool_msg.name, tool_msg.artifact)
+                    st.session_state.messages.append(
+                        store.append(
+                            session_id, "assistant", tool_msg.artifact, type=tool_msg.name
+                        )
                     )
+
+        # Keep the stored history bounded as well, not just the prompt.
+        st.session_state.chat_state["messages"] = trim_history(
+            st.session_state.chat_state["messages"]
+        )
+        store.save_messages(session_id, st.session_state.chat_state["messages"])
@@ -0,0 +1,129 @@
+"""
+Cold-start benchmark: how long a fresh process takes to become useful.
+
+Each step runs in its own new Python process, so module caches from an
+earlier step never hide the cost of a later one:
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --repeat 5 --app --json cold_start.json
+
+Steps:
+
+- ``settings``: parse the environment into `Settings`.
+- ``chat helpers``: import `utils.generic`.
+- ``app imports``: everything `app.py` imports before its first paint.
+- ``graph imports``: import `utils.graph` (LangGraph and the tools).
+- ``gemini client``: import `langchain_google_genai`.
+- ``graph build``: import and compile the graph with the scripted model.
+- ``first render`` (with ``--app``): run `app.py` once through Streamlit's
+  `AppTest`, i.e. what a new browser session waits for.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.graph_benchmark import percentile
+
+_TIMED = """
+import time
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+STEPS = {
+    "settings": "from utils.settings import get_settings; get_settings()",
+    "chat helpers": "import utils.generic",
+    "app imports": (
+        "import streamlit, utils.conversation_store, utils.generic, utils.rendering"
+    ),
+    "graph imports": "import utils.graph",
+    "gemini client": "import langchain_google_genai",
+    "graph build": (
+        "from benchmarks.fakes import ScriptedChatModel\n"
+        "from utils.graph import init_and_load_env\n"
+        "init_and_load_env(llm=ScriptedChatModel())"
+    ),
+}
+
+APP_STEP = (
+    "first render",
+    "from streamlit.testing.v1 import AppTest\n"
+    "AppTest.from_file('app.py', default_timeout=60).run()",
+)
+
+
+def time_step(code, env):
+    """Run ``code`` in a fresh interpreter and return its wall time in seconds."""
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMED.format(code=code)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(args):
+    # Dummy keys so the graph and the app start without a `.env`; nothing
+    # here calls the real APIs.
+    env = {
+        **os.environ,
+        "YELP_API_KEY": os.environ.get("YELP_API_KEY", "benchmark"),
+        "THE_MOVIE_DB_API_KEY": os.environ.get("THE_MOVIE_DB_API_KEY", "benchmark"),
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+    }
+    steps = dict(STEPS)
+    if args.app:
+        steps[APP_STEP[0]] = APP_STEP[1]
+
+    report = {"repeat": args.repeat, "steps_s": {}}
+    for name, code in steps.items():
+        samples = [time_step(code, env) for _ in range(args.repeat)]
+        report["steps_s"][name] = {
+            "p50": percentile(samples, 50),
+            "min": min(samples),
+            "max": max(samples),
+            "mean": statistics.fmean(samples),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"Fresh processes per step: {report['repeat']}")
+    for name, timings in report["steps_s"].items():
+        print(
+            f"{name + ':':<18}"
+            f"p50 {timings['p50'] * 1000:8.1f} ms, "
+            f"min {timings['min'] * 1000:8.1f} ms, "
+            f"max {timings['max'] * 1000:8.1f} ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark of the chatbot.")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Fresh processes per step."
+    )
+    parser.add_argument(
+        "--app", action="store_true", help="Also time the first render of app.py."
+    )
+    parser.add_argument(
+        "--json", default=None, help="Also write the report to this JSON file."
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Local stand-ins for Gemini, Yelp and TMDB used by the offline benchmarks.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+MOVIE_TITLES = [
+    "Inception",
+    "Heat",
+    "The Prestige",
+    "Interstellar",
+    "The Dark Knight",
+    "Arrival",
+    "Blade Runner",
+    "Alien",
+    "Memento",
+    "Parasite",
+]
+
+CUISINES = ["italian", "japanese", "mexican", "indian", "thai"]
+LOCATIONS = ["San Francisco, CA", "Austin, TX", "New York, NY"]
+PRICES = ["cheap", "moderate", "expensive"]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that answers from a fixed script instead of calling Gemini.
+
+    User messages are expected in the benchmark's compact form:
+
+    - ``movie: <title>`` -> a `get_movie_recommendations` tool call
+    - ``restaurant: <cuisine> | <location> | <price>`` -> a `restaurant_search` tool call
+    - anything else -> a short text reply
+
+    After tool results, the model replies with a summary. ``latency`` is the
+    simulated time to first token and ``token_latency`` the delay between
+    streamed tokens.
+    """
+
+    latency: float = 0.2
+    token_latency: float = 0.005
+    reply_tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-benchmark"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages):
+        last = messages[-1]
+        if isinstance(last, HumanMessage):
+            text = last.content.strip()
+            if text.lower().startswith("movie:"):
+                return self._tool_call(
+                    "get_movie_recommendations",
+                    {"movie_title": text.split(":", 1)[1].strip()},
+                )
+            if text.lower().startswith("restaurant:"):
+                cuisine, location, price = [
+                    part.strip() for part in text.split(":", 1)[1].split("|")
+                ]
+                return self._tool_call(
+                    "restaurant_search",
+                    {"cuisine": cuisine, "location": location, "price_tiers": price},
+                )
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=self._reply("Here are some great picks for you!"))
+        return AIMessage(
+            content=self._reply("Are you in the mood for food or a movie?")
+        )
+
+    def _tool_call(self, name, args):
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex}"}],
+        )
+
+    def _reply(self, opening):
+        return " ".join([opening] + ["lorem"] * self.reply_tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        message = self._respond(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                )
+            )
+            return
+        for i, token in enumerate(message.content.split(" ")):
+            if i:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=token if i == 0 else " " + token)
+            )
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class FakeUpstreamServer:
+    """
+    Threaded HTTP server imitating Yelp `/businesses/search` and the TMDB
+    `/search/movie` and `/movie/{id}/recommendations` endpoints.
+
+    Args:
+        latency (float): Seconds added to every response.
+        rate_limit_ratio (float): Probability (0-1) of answering 429 instead.
+        retry_after (float | None): `Retry-After` value sent with 429s.
+    """
+
+    def __init__(self, latency=0.05, rate_limit_ratio=0.0, retry_after=None):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.requests = Counter()
+        self.rate_limited = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def yelp_url(self):
+        return f"{self.base_url}/v3/businesses/search"
+
+    @property
+    def tmdb_url(self):
+        return f"{self.base_url}/3"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _record(self, endpoint, limited):
+        with self._lock:
+            self.requests[endpoint] += 1
+            if limited:
+                self.rate_limited[endpoint] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                time.sleep(server.latency)
+
+                if parsed.path.endswith("/businesses/search"):
+                    endpoint, body = "yelp_search", _fake_businesses(query)
+                elif parsed.path.endswith("/search/movie"):
+                    endpoint, body = "tmdb_search", _fake_search(query)
+                elif re.search(r"/movie/\d+/recommendations$", parsed.path):
+                    movie_id = int(parsed.path.split("/")[-2])
+                    endpoint, body = (
+                        "tmdb_recommendations",
+                        _fake_recommendations(movie_id),
+                    )
+                else:
+                    self._send(404, {"error": "not found"})
+                    return
+
+                limited = random.random() < server.rate_limit_ratio
+                server._record(endpoint, limited)
+                if limited:
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    self._send(429, {"error": "rate limited"}, headers)
+                else:
+                    self._send(200, body)
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def _movie_id(title):
+    return 1000 + sum(ord(c) for c in title.casefold())
+
+
+def _fake_search(query):
+    title = query.get("query", "")
+    return {
+        "results": [
+            {
+                "id": _movie_id(title),
+                "title": title.title(),
+                "release_date": "2010-07-16",
+                "popularity": 80.0,
+            }
+        ]
+    }
+
+
+def _fake_recommendations(movie_id):
+    rng = random.Random(movie_id)
+    return {
+        "results": [
+            {
+                "id": movie_id * 10 + i,
+                "title": rng.choice(MOVIE_TITLES) + f" {i}",
+                "vote_average": round(rng.uniform(5, 9), 1),
+                "original_language": "en",
+                "release_date": f"{rng.randint(1980, 2024)}-01-01",
+                "poster_path": f"/poster{movie_id}_{i}.jpg",
+                "popularity": rng.uniform(1, 100),
+                "overview": "x" * 300,
+            }
+            for i in range(20)
+        ]
+    }
+
+
+def _fake_businesses(query):
+    limit = int(query.get("limit", 5))
+    offset = int(query.get("offset", 0))
+    seed = f"{query.get('cuisine')}|{query.get('location')}|{query.get('price_tiers')}"
+    rng = random.Random(seed)
+    return {
+        "total": 100,
+        "businesses": [
+            {
+                "id": f"biz-{zlib.crc32(seed.encode()) % 10000}-{offset + i}",
+                "name": f"{str(query.get('cuisine', '')).title()} Place {offset + i}",
+                "rating": round(rng.uniform(3, 5), 1),
+                "review_count": rng.randint(10, 2000),
+                "price": "$" * rng.randint(1, 4),
+                "display_phone": "(555) 010-0000",
+                "categories": [
+                    {"alias": "food", "title": str(query.get("cuisine", "")).title()}
+                ],
+                "location": {
+                    "address1": f"{rng.randint(1, 999)} Main St",
+                    "city": str(query.get("location", "")).split(",")[0],
+                    "state": "CA",
+                    "zip_code": "94100",
+                },
+                "coordinates": {"latitude": 37.77, "longitude": -122.41},
+                "image_url": "https://example.com/image.jpg",
+                "transactions": ["pickup", "delivery"],
+            }
+            for i in range(limit)
+        ],
+    }
@@ -0,0 +1,265 @@
+"""
+Offline end-to-end benchmark of the chatbot graph.
+
+Runs the graph from `init_and_load_env` with a scripted chat model and local
+fake Yelp/TMDB servers, simulating N concurrent sessions of T turns each:
+
+    python -m benchmarks.graph_benchmark --sessions 8 --turns 10
+    python -m benchmarks.graph_benchmark --upstream-latency 0.2 --rate-limit-ratio 0.1
+    python -m benchmarks.graph_benchmark --unique-queries --json results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+from benchmarks.fakes import (
+    CUISINES,
+    LOCATIONS,
+    MOVIE_TITLES,
+    PRICES,
+    FakeUpstreamServer,
+    ScriptedChatModel,
+)
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile (0-100) of ``values`` using linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def make_prompt(rng, session, turn, unique):
+    """Return a scripted user message; a skewed pool makes repeat queries common."""
+    suffix = f" {session}-{turn}" if unique else ""
+    kind = rng.random()
+    if kind < 0.45:
+        # Zipf-like skew towards the first, most "popular" titles.
+        title = MOVIE_TITLES[
+            min(int(rng.paretovariate(1.2)) - 1, len(MOVIE_TITLES) - 1)
+        ]
+        return f"movie: {title}{suffix}"
+    if kind < 0.9:
+        return "restaurant: {} | {} | {}".format(
+            rng.choice(CUISINES) + suffix, rng.choice(LOCATIONS), rng.choice(PRICES)
+        )
+    return "hello there"
+
+
+def run_session(graph, session, turns, seed, unique, stream):
+    """Run one simulated session and return per-turn measurements."""
+    from utils.generic import stream_chat_events
+
+    rng = random.Random(seed + session)
+    state = {"messages": [SystemMessage(content="You are a benchmark assistant.")]}
+    results = []
+    for turn in range(turns):
+        state["messages"].append(
+            HumanMessage(content=make_prompt(rng, session, turn, unique))
+        )
+        started = time.perf_counter()
+        ttft = None
+        tool_calls = 0
+        if stream:
+            for event, payload in stream_chat_events(graph, state):
+                if event == "message":
+                    state["messages"].append(payload)
+                elif event == "tools":
+                    state["messages"].extend(payload)
+                    tool_calls += len(payload)
+                elif event == "done":
+                    ttft = payload["time_to_first_token"]
+        else:
+            output = graph.invoke(state)
+            new_messages = output["messages"][len(state["messages"]) :]
+            tool_calls = sum(isinstance(m, ToolMessage) for m in new_messages)
+            state["messages"] = output["messages"]
+        results.append(
+            {
+                "latency": time.perf_counter() - started,
+                "ttft": ttft,
+                "tool_calls": tool_calls,
+            }
+        )
+    return results
+
+
+def run_benchmark(args):
+    server = FakeUpstreamServer(
+        latency=args.upstream_latency,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+    ).start()
+    os.environ.update(
+        {
+            "YELP_API_KEY": "benchmark",
+            "THE_MOVIE_DB_API_KEY": "benchmark",
+            "YELP_BASE_URL": server.yelp_url,
+            "BASE_URL": server.tmdb_url,
+            # Keep the fake IDs out of the app's persisted movie index and
+            # out of any SQLite cache or rate limits shared with a live app.
+            # Empty rather than unset, so a `.env` can't fill them back in.
+            "TMDB_INDEX_PATH": "",
+            "TMDB_CACHE_DB": "",
+            "RATE_LIMIT_DB": "",
+        }
+    )
+
+    # Imported after the environment points at the fake servers.
+    from utils.graph import init_and_load_env
+    from utils.retry import retry_stats
+    from utils.the_movie_db_fetch import get_the_movie_db_response_cache
+
+    llm = ScriptedChatModel(
+        latency=args.model_latency,
+        token_latency=args.token_latency,
+    )
+    graph = init_and_load_env(llm=llm)
+    retries_before = retry_stats()
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            futures = [
+                executor.submit(
+                    run_session,
+                    graph,
+                    session,
+                    args.turns,
+                    args.seed,
+                    args.unique_queries,
+                    not args.no_stream,
+                )
+                for session in range(args.sessions)
+            ]
+            turns = [turn for future in futures for turn in future.result()]
+    finally:
+        elapsed = time.perf_counter() - started
+        server.stop()
+
+    retries_after = retry_stats()
+    latencies = [t["latency"] for t in turns]
+    ttfts = [t["ttft"] for t in turns if t["ttft"] is not None]
+    return {
+        "sessions": args.sessions,
+        "turns": len(turns),
+        "elapsed_s": elapsed,
+        "throughput_turns_per_s": len(turns) / elapsed if elapsed else None,
+        "latency_s": {
+            "mean": statistics.fmean(latencies) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=None),
+        },
+        "ttft_s": {
+            "p50": percentile(ttfts, 50),
+            "p90": percentile(ttfts, 90),
+        },
+        "tool_calls": sum(t["tool_calls"] for t in turns),
+        "upstream_requests": dict(server.requests),
+        "upstream_rate_limited": dict(server.rate_limited),
+        "retries": {
+            name: counts["retries"] - retries_before.get(name, {}).get("retries", 0)
+            for name, counts in retries_after.items()
+        },
+        "tmdb_cache": get_the_movie_db_response_cache().stats(),
+    }
+
+
+def print_report(report):
+    def fmt(value):
+        return "-" if value is None else f"{value * 1000:.1f} ms"
+
+    print(f"Sessions:           {report['sessions']}")
+    print(f"Turns:              {report['turns']} in {report['elapsed_s']:.2f}s")
+    print(f"Throughput:         {report['throughput_turns_per_s']:.2f} turns/s")
+    latency = report["latency_s"]
+    print(
+        "Turn latency:       "
+        f"p50 {fmt(latency['p50'])}, p90 {fmt(latency['p90'])}, "
+        f"p99 {fmt(latency['p99'])}, max {fmt(latency['max'])}"
+    )
+    print(
+        "Time to 1st token:  "
+        f"p50 {fmt(report['ttft_s']['p50'])}, p90 {fmt(report['ttft_s']['p90'])}"
+    )
+    print(f"Tool calls:         {report['tool_calls']}")
+    print(f"Upstream requests:  {report['upstream_requests']}")
+    print(f"Upstream 429s:      {report['upstream_rate_limited']}")
+    print(f"Retries:            {report['retries']}")
+    print(f"TMDB cache:         {report['tmdb_cache']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline chatbot graph benchmark.")
+    parser.add_argument(
+        "--sessions", type=int, default=4, help="Concurrent simulated sessions."
+    )
+    parser.add_argument("--turns", type=int, default=10, help="Turns per session.")
+    parser.add_argument(
+        "--model-latency",
+        type=float,
+        default=0.2,
+        help="Fake model time to first token (s).",
+    )
+    parser.add_argument(
+        "--token-latency",
+        type=float,
+        default=0.005,
+        help="Fake model delay per streamed token (s).",
+    )
+    parser.add_argument(
+        "--upstream-latency",
+        type=float,
+        default=0.05,
+        help="Fake Yelp/TMDB response latency (s).",
+    )
+    parser.add_argument(
+        "--rate-limit-ratio",
+        type=float,
+        default=0.0,
+        help="Share of upstream requests answered with 429.",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=None,
+        help="Retry-After seconds sent with 429s.",
+    )
+    parser.add_argument(
+        "--unique-queries",
+        action="store_true",
+        help="Make every query unique to defeat caching.",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Use graph.invoke instead of token streaming.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Workload random seed.")
+    parser.add_argument(
+        "--json", default=None, help="Also write the report to this JSON file."
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Headless HTTP API for the chatbot graph, with Server-Sent Events streaming.
+
+    uvicorn server:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+
+- ``POST /conversations/{thread_id}/messages`` with ``{"content": "..."}``
+  streams the turn as SSE events (``token``, ``message``, ``progress``,
+  ``tools``, ``done``, or ``error``).
+- ``GET /conversations/{thread_id}`` returns the stored message history.
+- ``GET /healthz`` and ``GET /metrics`` (Prometheus text format).
+
+Conversation state lives in an in-memory LangGraph checkpointer keyed by
+``thread_id``, so a conversation must keep reaching the same process: run one
+worker (it serves many conversations concurrently on its event loop) or route
+each ``thread_id`` to a fixed worker. Memory stays bounded: the stored history
+is trimmed after every turn like the Streamlit app's, and idle or least
+recently used conversations are evicted (``API_MAX_THREADS``,
+``API_THREAD_TTL``).
+"""
+
+import asyncio
+import json
+import weakref
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from langchain_core.messages import (
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    messages_to_dict,
+)
+from pydantic import BaseModel, Field
+
+from utils.checkpointer import get_checkpointer
+from utils.generic import astream_chat_events, load_prompt_from_file, trim_history
+from utils.graph import init_and_load_env
+from utils.tracing import PrometheusSink, add_sink, get_sinks
+
+
+class MessageRequest(BaseModel):
+    content: str = Field(..., min_length=1, description="The user's message.")
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def trim_stored_history(graph, config):
+    """
+    Bound a conversation's stored messages with `trim_history`.
+
+    Dropped turns are removed from the checkpoint, and earlier tool results
+    are replaced by their summaries (same message ID).
+    """
+    snapshot = await graph.aget_state(config)
+    messages = snapshot.values.get("messages") or []
+    trimmed = trim_history(messages)
+    originals = {m.id: m for m in messages}
+    kept = {m.id for m in trimmed}
+    update = [RemoveMessage(id=m.id) for m in messages if m.id not in kept]
+    update += [m for m in trimmed if m is not originals.get(m.id)]
+    if update:
+        await graph.aupdate_state(config, {"messages": update})
+
+
+def create_app(graph=None):
+    """
+    Build the API around ``graph``; by default the Gemini graph from
+    `init_and_load_env` with a bounded in-memory checkpointer, built at startup.
+    """
+    # Turns of one conversation run one after another; different
+    # conversations run concurrently on the event loop.
+    thread_locks = weakref.WeakValueDictionary()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.graph = (
+            graph
+            if graph is not None
+            else init_and_load_env(checkpointer=get_checkpointer())
+        )
+        metrics = next((s for s in get_sinks() if isinstance(s, PrometheusSink)), None)
+        if metrics is None:
+            metrics = PrometheusSink()
+            add_sink(metrics)
+        app.state.metrics = metrics
+        yield
+
+    app = FastAPI(
+        title="Restaurant and Movie Recommendation ChatBot", lifespan=lifespan
+    )
+
+    def thread_lock(thread_id):
+        lock = thread_locks.get(thread_id)
+        if lock is None:
+            lock = thread_locks[thread_id] = asyncio.Lock()
+        return lock
+
+    @app.post("/conversations/{thread_id}/messages")
+    async def post_message(thread_id: str, request: MessageRequest):
+        graph = app.state.graph
+        config = {"configurable": {"thread_id": thread_id}}
+        lock = thread_lock(thread_id)
+
+        async def events():
+            async with lock:
+                snapshot = await graph.aget_state(config)
+                messages = []
+                if not snapshot.values.get("messages"):
+                    base_prompt = load_prompt_from_file(r"static/prompts/base.txt")
+                    messages.append(SystemMessage(content=base_prompt))
+                messages.append(HumanMessage(content=request.content))
+
+                try:
+                    async for event, payload in astream_chat_events(
+                        graph, {"messages": messages}, config
+                    ):
+                        if event == "token":
+                            yield sse_event("token", {"text": payload})
+                        elif event == "message":
+                            yield sse_event("message", messages_to_dict([payload])[0])
+                        elif event == "tools":
+                            yield sse_event("tools", messages_to_dict(payload))
+                        else:
+                            yield sse_event(event, payload)
+                    await trim_stored_history(graph, config)
+                except Exception as e:
+                    print(f"Error: Turn for conversation {thread_id} failed: {e}")
+                    yield sse_event("error", {"detail": str(e)})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/conversations/{thread_id}")
+    async def get_conversation(thread_id: str):
+        snapshot = await app.state.graph.aget_state(
+            {"configurable": {"thread_id": thread_id}}
+        )
+        messages = snapshot.values.get("messages")
+        if not messages:
+            raise HTTPException(status_code=404, detail="Conversation not found.")
+        return {"thread_id": thread_id, "messages": messages_to_dict(messages)}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return app.state.metrics.render()
+
+    return app
+
+
+app = create_app()
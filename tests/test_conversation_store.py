@@ -0,0 +1,44 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from utils.conversation_store import ConversationStore
+
+
+def test_in_memory_round_trip():
+    store = ConversationStore()
+    store.append("s", "user", "hi")
+    store.append("s", "assistant", [{"id": 1}], type="restaurant_search")
+    store.save_messages("s", [HumanMessage(content="hi"), AIMessage(content="hello")])
+
+    entries, messages = store.load("s")
+    assert [e["type"] for e in entries] == ["generic", "restaurant_search"]
+    assert [m.content for m in messages] == ["hi", "hello"]
+    assert store.load("unknown") == ([], [])
+
+
+def test_processes_sharing_a_database_keep_every_entry(tmp_path):
+    # Two stores on one file stand in for two worker processes.
+    db_path = str(tmp_path / "conversations.sqlite3")
+    first = ConversationStore(db_path=db_path)
+    second = ConversationStore(db_path=db_path)
+    first.load("s")
+    second.load("s")
+
+    first.append("s", "user", "one")
+    second.append("s", "assistant", "two")
+    first.append("s", "user", "three")
+    second.save_messages("s", [HumanMessage(content="one")])
+
+    for store in (first, second, ConversationStore(db_path=db_path)):
+        entries, messages = store.load("s")
+        assert [e["content"] for e in entries] == ["one", "two", "three"]
+        assert [m.content for m in messages] == ["one"]
+
+
+def test_delete_removes_the_session_everywhere(tmp_path):
+    db_path = str(tmp_path / "conversations.sqlite3")
+    store = ConversationStore(db_path=db_path)
+    store.append("s", "user", "hi")
+    store.delete("s")
+
+    assert store.load("s") == ([], [])
+    assert ConversationStore(db_path=db_path).load("s") == ([], [])
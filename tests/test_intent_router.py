@@ -0,0 +1,86 @@
+import pytest
+
+from utils.intent_router import parse_intent
+
+
+@pytest.mark.parametrize(
+    "text, title",
+    [
+        ("movies like Heat", "Heat"),
+        ("films similar to The Dark Knight?", "The Dark Knight"),
+        ("recommend me some movies like Inception", "Inception"),
+        ("any good films like 'Blade Runner 2049'", "Blade Runner 2049"),
+    ],
+)
+def test_routes_movie_requests(text, title):
+    assert parse_intent(text) == {
+        "name": "get_movie_recommendations",
+        "args": {"movie_title": title},
+    }
+
+
+@pytest.mark.parametrize(
+    "text, cuisine, location, price",
+    [
+        ("cheap mexican in Austin, TX", "mexican", "Austin, TX", "cheap"),
+        (
+            "find me some good cheap ramen spots near San Jose, CA",
+            "ramen",
+            "San Jose, CA",
+            "cheap",
+        ),
+        (
+            "recommend a moderately priced italian restaurant in Boston",
+            "italian",
+            "Boston",
+            "moderate",
+        ),
+        ("upscale dim sum in San Francisco", "dim sum", "San Francisco", "expensive"),
+        ("affordable korean bbq near Oakland", "korean bbq", "Oakland", "cheap"),
+        ("cheap thai food in Chicago", "thai", "Chicago", "cheap"),
+    ],
+)
+def test_routes_restaurant_requests(text, cuisine, location, price):
+    call = parse_intent(text)
+    assert call["name"] == "restaurant_search"
+    assert call["args"]["cuisine"] == cuisine
+    assert call["args"]["location"] == location
+    assert call["args"]["price_tiers"] == price
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Follow-ups that refer back to earlier results.
+        "more movies like that",
+        "movies like it",
+        "movies like the second one",
+        "films similar to those",
+        "movies like the last one",
+        # Extra constraints the tool can't express.
+        "movies like Heat but funnier",
+        "movies like Heat and cheap sushi in Boston",
+        "movies like Up for kids",
+        # Leading words that aren't part of the cuisine.
+        "I want cheap sushi in Boston",
+        "we need cheap pizza in Denver",
+        # Not a cuisine at all.
+        "cheap flights in Austin",
+        "cheap hotels near Seattle",
+        # The location is the user or ends in filler.
+        "cheap sushi near me",
+        "cheap sushi in my area",
+        "cheap sushi around here",
+        "recommend cheap thai food in Chicago please",
+        "cheap tacos in Austin now",
+        # Compound or underspecified requests.
+        "cheap mexican in Austin and movies like Heat",
+        "cheap mexican in Austin tonight",
+        "cheap or expensive sushi in Boston",
+        "sushi in Boston",
+        "cheap sushi",
+        "hello there",
+    ],
+)
+def test_leaves_other_requests_to_the_model(text):
+    assert parse_intent(text) is None
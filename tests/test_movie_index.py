@@ -0,0 +1,79 @@
+import pytest
+
+from utils.movie_index import MovieIndex, split_year
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Heat (1995)", ("Heat", "1995")),
+        ("Heat", ("Heat", None)),
+        ("Blade Runner 2049", ("Blade Runner 2049", None)),
+        ("Wonder Woman 1984", ("Wonder Woman 1984", None)),
+        ("Class of 1984", ("Class of 1984", None)),
+        ("(1995)", ("(1995)", None)),
+    ],
+)
+def test_split_year(query, expected):
+    assert split_year(query) == expected
+
+
+@pytest.fixture
+def index():
+    index = MovieIndex()
+    index.add_many(
+        [
+            {"id": 1, "title": "Aliens", "release_date": "1986-07-18"},
+            {"id": 2, "title": "Heat", "release_date": "1995-12-15", "popularity": 50},
+            {"id": 3, "title": "Heat", "release_date": "1986-03-14", "popularity": 5},
+            {"id": 4, "title": "Blade Runner 2049", "release_date": "2017-10-04"},
+            {"id": 5, "title": "The Thing", "release_date": "1982-06-25"},
+        ]
+    )
+    return index
+
+
+@pytest.mark.parametrize(
+    "query, movie_id",
+    [
+        ("heat", 2),
+        ("HEAT!", 2),
+        ("The Thing", 5),
+        ("Heat (1986)", 3),
+        ("Blade Runner 2049", 4),
+    ],
+)
+def test_resolve(index, query, movie_id):
+    assert index.resolve(query)["id"] == movie_id
+
+
+@pytest.mark.parametrize(
+    "query", ["Alien", "Heat (2001)", "Blade Runner", "The Heat", "Thing"]
+)
+def test_resolve_leaves_near_misses_to_search(index, query):
+    assert index.resolve(query) is None
+
+
+def test_resolve_uses_aliases_of_past_queries(index):
+    index.add_alias("the alien sequel", {"id": 1, "title": "Aliens"})
+    assert index.resolve("The Alien Sequel") == {"id": 1, "title": "Aliens"}
+
+
+def test_load_rekeys_older_files(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text(
+        '{"titles": {"thing": [{"id": 5, "title": "The Thing", "year": "1982",'
+        ' "popularity": 1}]}, "aliases": {"the thing": ["thing", 5]}}'
+    )
+    index = MovieIndex(path=str(path))
+    assert index.resolve("The Thing") == {"id": 5, "title": "The Thing"}
+    assert index.resolve("Thing") is None
+
+
+def test_save_and_load_round_trip(tmp_path, index):
+    index.path = str(tmp_path / "index.json")
+    index.add_alias("that heist movie", {"id": 2, "title": "Heat"})
+    index.save()
+    loaded = MovieIndex(path=index.path)
+    assert loaded.resolve("that heist movie") == {"id": 2, "title": "Heat"}
+    assert loaded.resolve("The Heat") is None
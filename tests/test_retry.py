@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+import requests
+
+from utils.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    arequest_with_retry,
+    request_with_retry,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+def call(send, breaker):
+    return request_with_retry(
+        send, "test", policy=RetryPolicy(max_attempts=1), breaker=breaker
+    )
+
+
+def raise_(exc):
+    def send():
+        raise exc
+
+    return send
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        requests.exceptions.ChunkedEncodingError("broken"),
+        ValueError("bad payload"),
+        requests.ConnectionError("refused"),
+    ],
+)
+def test_failed_half_open_trial_frees_the_trial_slot(exc):
+    breaker = half_open_breaker()
+    with pytest.raises(type(exc)):
+        call(raise_(exc), breaker)
+
+    # The trial counted as a failure, and once the circuit is half-open again
+    # the next call is let through instead of being short-circuited forever.
+    assert breaker.failures == 2
+    assert call(lambda: FakeResponse(), breaker).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_interrupted_half_open_trial_frees_the_trial_slot():
+    breaker = half_open_breaker()
+    with pytest.raises(KeyboardInterrupt):
+        call(raise_(KeyboardInterrupt()), breaker)
+
+    assert breaker.failures == 1
+    assert call(lambda: FakeResponse(), breaker).status_code == 200
+
+
+def test_cancelled_async_half_open_trial_frees_the_trial_slot():
+    breaker = half_open_breaker()
+
+    async def send():
+        raise asyncio.CancelledError()
+
+    async def run():
+        with pytest.raises(asyncio.CancelledError):
+            await arequest_with_retry(
+                send, "test", policy=RetryPolicy(max_attempts=1), breaker=breaker
+            )
+
+    asyncio.run(run())
+    assert breaker.allow()
+
+
+def test_open_circuit_short_circuits():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        call(lambda: FakeResponse(), breaker)
@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import ToolMessage
+
+from benchmarks.fakes import FakeUpstreamServer, ScriptedChatModel
+from server import create_app
+from utils.checkpointer import BoundedMemorySaver
+from utils.settings import get_settings
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    server = FakeUpstreamServer(latency=0).start()
+    monkeypatch.setenv("YELP_API_KEY", "test")
+    monkeypatch.setenv("THE_MOVIE_DB_API_KEY", "test")
+    monkeypatch.setenv("YELP_BASE_URL", server.yelp_url)
+    monkeypatch.setenv("BASE_URL", server.tmdb_url)
+    monkeypatch.setenv("TMDB_INDEX_PATH", "")
+    monkeypatch.setenv("CHAT_HISTORY_TOKEN_BUDGET", "2000")
+    get_settings.cache_clear()
+    yield server
+    server.stop()
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def checkpointer():
+    return BoundedMemorySaver(max_threads=2)
+
+
+@pytest.fixture
+def client(upstream, checkpointer):
+    from utils.graph import init_and_load_env
+
+    graph = init_and_load_env(
+        llm=ScriptedChatModel(latency=0, token_latency=0), checkpointer=checkpointer
+    )
+    with TestClient(create_app(graph)) as client:
+        yield client
+
+
+def post(client, thread_id, content):
+    response = client.post(
+        f"/conversations/{thread_id}/messages", json={"content": content}
+    )
+    assert response.status_code == 200
+    assert "event: done" in response.text
+    return response.text
+
+
+def test_stored_state_stays_bounded(client, checkpointer):
+    for turn in range(30):
+        post(client, "a", f"restaurant: ramen {turn} | Austin, TX | cheap")
+
+    messages = client.get("/conversations/a").json()["messages"]
+    assert messages[0]["type"] == "system"
+    # Trimmed to the token budget rather than 30 full turns.
+    assert len(messages) < 20
+    # One checkpoint per thread, and one stored value per channel.
+    assert len(checkpointer.storage["a"][""]) == 1
+    assert len(checkpointer.blobs) <= len(checkpointer._versions[("a", "")])
+
+
+def test_earlier_tool_results_are_summarized(client):
+    post(client, "a", "restaurant: ramen | Austin, TX | cheap")
+    post(client, "a", "restaurant: sushi | Austin, TX | cheap")
+
+    snapshot = client.app.state.graph.get_state({"configurable": {"thread_id": "a"}})
+    tool_messages = [
+        m for m in snapshot.values["messages"] if isinstance(m, ToolMessage)
+    ]
+    assert tool_messages[0].content.startswith("[restaurant_search summary]")
+    assert not tool_messages[-1].content.startswith("[restaurant_search summary]")
+
+
+def test_least_recently_used_threads_are_evicted(client, checkpointer):
+    for thread_id in ("a", "b", "a", "c"):
+        post(client, thread_id, "hello")
+
+    assert client.get("/conversations/a").status_code == 200
+    assert client.get("/conversations/b").status_code == 404
+    assert client.get("/conversations/c").status_code == 200
+    assert checkpointer.threads() == ["a", "c"]
+    assert all(key[0] != "b" for key in checkpointer.blobs)
+    assert "b" not in checkpointer.storage
+
+
+def test_idle_threads_expire(client, checkpointer):
+    post(client, "a", "hello")
+    checkpointer.ttl = 0
+    post(client, "b", "hello")
+
+    assert client.get("/conversations/a").status_code == 404
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+import utils.the_movie_db_fetch as tmdb
+from utils.retry import RetryPolicy
+from utils.settings import get_settings
+
+BODY = {"results": [{"id": 7, "title": "Ronin", "poster_path": "/ronin.jpg"}]}
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setenv("THE_MOVIE_DB_API_KEY", "test")
+    monkeypatch.setenv("BASE_URL", "http://tmdb.invalid/3")
+    monkeypatch.setenv("TMDB_INDEX_PATH", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake `make_request_with_retry`: the best-effort attempt blocks, then fails."""
+    prefetch_started = threading.Event()
+    release_prefetch = threading.Event()
+    calls = []
+
+    def make_request_with_retry(url, params, headers, policy=None):
+        calls.append(policy)
+        if policy is not None:
+            prefetch_started.set()
+            release_prefetch.wait(5)
+            return None
+        return BODY
+
+    monkeypatch.setattr(tmdb, "make_request_with_retry", make_request_with_retry)
+    return prefetch_started, release_prefetch, calls
+
+
+def test_user_request_retries_after_a_failed_shared_prefetch(upstream):
+    prefetch_started, release_prefetch, calls = upstream
+    movie_id = 900001
+    best_effort = RetryPolicy(max_attempts=1, rate_limit_wait=0)
+
+    prefetch = threading.Thread(
+        target=tmdb.fetch_recommendations,
+        args=(movie_id,),
+        kwargs={"policy": best_effort},
+    )
+    prefetch.start()
+    assert prefetch_started.wait(5)
+
+    result = {}
+    user = threading.Thread(
+        target=lambda: result.setdefault("value", tmdb.fetch_recommendations(movie_id))
+    )
+    user.start()
+    user.join(0.2)
+    # The user request joined the prefetch instead of making its own call.
+    assert user.is_alive() and calls == [best_effort]
+    release_prefetch.set()
+    prefetch.join(5)
+    user.join(5)
+
+    assert [m["title"] for m in result["value"]] == ["Ronin"]
+    assert calls == [best_effort, None]
+
+
+def test_failed_prefetch_alone_returns_none(upstream):
+    _, release_prefetch, calls = upstream
+    release_prefetch.set()
+    best_effort = RetryPolicy(max_attempts=1, rate_limit_wait=0)
+
+    assert tmdb.fetch_recommendations(900002, policy=best_effort) is None
+    assert calls == [best_effort]
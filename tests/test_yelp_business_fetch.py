@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeUpstreamServer
+from utils.settings import get_settings
+from utils.yelp_business_fetch import (
+    RankedBusinesses,
+    iter_search_pages,
+    restaurant_search,
+)
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def yelp(monkeypatch):
+    server = FakeUpstreamServer(latency=LATENCY).start()
+    monkeypatch.setenv("YELP_API_KEY", "test")
+    monkeypatch.setenv("YELP_BASE_URL", server.yelp_url)
+    monkeypatch.setenv("YELP_PAGE_SIZE", "50")
+    get_settings.cache_clear()
+    yield server
+    server.stop()
+    get_settings.cache_clear()
+
+
+def business(id, rating, review_count=10):
+    return {"id": id, "rating": rating, "review_count": review_count}
+
+
+def test_ranked_businesses_dedups_and_keeps_the_best():
+    ranked = RankedBusinesses(maxsize=3)
+    assert ranked.add([business("a", 4.0), business("b", 4.5), business("a", 5.0)]) == 2
+    assert (
+        ranked.add([business("c", 4.5, 500), business("d", 3.0), business("e", 4.8)])
+        == 3
+    )
+    assert [b["id"] for b in ranked.ranked()] == ["e", "c", "b"]
+    assert len(ranked) == 3
+
+
+def test_one_request_per_page_of_fifty(yelp):
+    pages = list(iter_search_pages("ramen", "Austin, TX", "cheap", limit=50))
+    assert [len(p) for p in pages] == [50]
+    assert yelp.requests["yelp_search"] == 1
+
+
+def test_pages_until_the_limit(yelp):
+    pages = list(iter_search_pages("ramen", "Austin, TX", "cheap", limit=70))
+    assert [len(p) for p in pages] == [50, 20]
+
+
+def test_stops_at_the_reported_total(yelp):
+    # The fake server reports 100 matches.
+    pages = list(iter_search_pages("ramen", "Austin, TX", "cheap", limit=240))
+    assert [len(p) for p in pages] == [50, 50]
+    assert yelp.requests["yelp_search"] == 2
+
+
+def test_cuisines_are_searched_concurrently(yelp):
+    started = time.perf_counter()
+    _, businesses = restaurant_search.func(
+        "ramen, sushi, pizza", "Austin, TX", "cheap", 10
+    )
+    elapsed = time.perf_counter() - started
+
+    assert len(businesses) == 30
+    assert yelp.requests["yelp_search"] == 3
+    assert elapsed < 2 * LATENCY
+
+
+def test_async_cuisines_are_searched_concurrently(yelp):
+    started = time.perf_counter()
+    _, businesses = asyncio.run(
+        restaurant_search.coroutine("ramen, sushi, pizza", "Austin, TX", "cheap", 10)
+    )
+    elapsed = time.perf_counter() - started
+
+    assert len(businesses) == 30
+    assert elapsed < 2 * LATENCY
+
+
+def test_duplicate_cuisines_are_deduplicated(yelp):
+    _, businesses = restaurant_search.func("ramen, Ramen", "Austin, TX", "cheap", 10)
+    assert len({b["id"] for b in businesses}) == len(businesses) == 10
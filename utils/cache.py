@@ -0,0 +1,194 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.tracing import increment
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache with per-entry TTL.
+
+    When ``db_path`` is given, entries are also written through to a SQLite
+    file so that several Streamlit worker processes can share warm results.
+    Values stored in the cache must be JSON-serializable and are treated as
+    immutable by callers.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(self, maxsize=512, ttl=3600, db_path=None, namespace="default"):
+        if maxsize < 1:
+            raise ValueError("Cache maxsize must be at least 1.")
+        if ttl <= 0:
+            raise ValueError("Cache ttl must be a positive number of seconds.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.db_path = db_path
+        self.namespace = namespace
+
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.db_path:
+            self._init_db()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default`` on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    increment("cache_hits", cache=self.namespace)
+                    return value
+                del self._data[key]
+                self.expirations += 1
+
+        if self.db_path:
+            entry = self._db_get(key, now)
+            if entry is not None:
+                expires_at, value = entry
+                with self._lock:
+                    self._store(key, value, expires_at)
+                    self.hits += 1
+                increment("cache_hits", cache=self.namespace)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        increment("cache_misses", cache=self.namespace)
+        return default
+
+    def contains(self, key):
+        """Return whether a fresh entry for ``key`` is in memory, without touching the counters or LRU order."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache TTL)."""
+        expires_at = time.time() + (ttl or self.ttl)
+        with self._lock:
+            self._store(key, value, expires_at)
+            self._writes += 1
+            prune = self._writes % self._PRUNE_EVERY == 0
+
+        if self.db_path:
+            self._db_set(key, value, expires_at, prune)
+
+    def clear(self):
+        """Drop every entry (including the on-disk copy) and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _store(self, key, value, expires_at):
+        # Caller must hold self._lock.
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+            increment("cache_evictions", cache=self.namespace)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    def _db_get(self, key, now):
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Cache read failed for {self.db_path}: {e}")
+            return None
+
+        if row is None or row[1] <= now:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _db_set(self, key, value, expires_at, prune):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), expires_at),
+                )
+                if prune:
+                    conn.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                        (self.namespace, time.time()),
+                    )
+                    # Keep the shared table bounded to the same size as the LRU.
+                    conn.execute(
+                        """
+                        DELETE FROM cache WHERE namespace = ? AND key NOT IN (
+                            SELECT key FROM cache WHERE namespace = ?
+                            ORDER BY expires_at DESC LIMIT ?
+                        )
+                        """,
+                        (self.namespace, self.namespace, self.maxsize),
+                    )
+        except sqlite3.Error as e:
+            print(f"Cache write failed for {self.db_path}: {e}")
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from utils.settings import get_settings
+from utils.tracing import increment
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-memory LangGraph checkpointer with bounded memory.
+
+    `InMemorySaver` keeps every checkpoint and every version of every channel
+    for every thread forever. This one keeps only what resuming a
+    conversation needs:
+
+    - the latest checkpoint per thread (and its pending writes), with the
+      channel values it references; older checkpoints are dropped as soon as
+      a newer one is saved, so there's no time travel;
+    - at most ``max_threads`` threads, least recently used evicted first,
+      and none idle for longer than ``ttl`` seconds.
+
+    The size of each remaining state is bounded by the caller, e.g. by
+    trimming the stored messages after every turn (see `server.py`).
+    """
+
+    def __init__(self, max_threads=1000, ttl=24 * 3600.0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._last_used = OrderedDict()  # thread id -> monotonic time of last save
+        self._versions = {}  # (thread id, namespace) -> {channel: stored version}
+        self._lock = threading.Lock()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            self._drop_older(thread_id, checkpoint_ns, checkpoint["id"], new_versions)
+            self._last_used[thread_id] = time.monotonic()
+            self._last_used.move_to_end(thread_id)
+            self._evict()
+        return saved
+
+    def get_tuple(self, config):
+        # The base class's defaultdicts would keep an empty entry for every
+        # unknown or evicted thread that is looked up.
+        if config["configurable"]["thread_id"] not in self.storage:
+            return None
+        return super().get_tuple(config)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            self._delete(thread_id)
+
+    def threads(self):
+        """Return the IDs of the stored threads, least recently used first."""
+        # Not `__len__`: LangGraph checks the checkpointer's truthiness.
+        with self._lock:
+            return list(self._last_used)
+
+    def _drop_older(self, thread_id, checkpoint_ns, checkpoint_id, new_versions):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for old_id in [c for c in checkpoints if c != checkpoint_id]:
+            del checkpoints[old_id]
+            self.writes.pop((thread_id, checkpoint_ns, old_id), None)
+
+        versions = self._versions.setdefault((thread_id, checkpoint_ns), {})
+        for channel, version in new_versions.items():
+            previous = versions.get(channel)
+            if previous is not None and previous != version:
+                self.blobs.pop((thread_id, checkpoint_ns, channel, previous), None)
+            versions[channel] = version
+
+    def _evict(self):
+        expire_before = time.monotonic() - self.ttl
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if len(self._last_used) <= self.max_threads and last_used >= expire_before:
+                break
+            self._delete(thread_id)
+            increment("checkpoint_threads_evicted")
+
+    def _delete(self, thread_id):
+        # Only this thread's keys, instead of scanning every stored write and blob.
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for channel, version in self._versions.pop(
+                (thread_id, checkpoint_ns), {}
+            ).items():
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+        self._last_used.pop(thread_id, None)
+
+
+def get_checkpointer():
+    """
+    Build the API server's checkpointer.
+
+    Bounded by ``API_MAX_THREADS`` (default 1000) conversations, each dropped
+    after ``API_THREAD_TTL`` seconds (default one day) without a new turn.
+    """
+    settings = get_settings()
+    return BoundedMemorySaver(
+        max_threads=settings.api_max_threads,
+        ttl=settings.api_thread_ttl,
+    )
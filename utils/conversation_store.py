@@ -0,0 +1,208 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+from utils.settings import get_settings
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class ConversationStore:
+    """Thread-safe per-session record of a chat, kept in memory and optionally in SQLite.
+
+    Each session holds two things:
+
+    - display entries: what the UI shows, in order, as dicts with ``role``,
+      ``type`` (``"generic"`` for text, otherwise the tool name) and
+      ``content`` (text, or the tool's structured artifact), so a rerun can
+      redraw every turn and result card without any LLM or API call;
+    - the model-facing message history, so a resumed session continues with
+      the same context.
+
+    Sessions are kept in an LRU of ``max_sessions``. With ``db_path`` every
+    change is written through to SQLite and `load` reads through it, so
+    sessions survive a server restart and are shared by worker processes:
+    entries appended by any process are numbered by SQLite and none are lost,
+    while the message history is replaced as a whole (last writer wins).
+    """
+
+    def __init__(self, db_path=None, max_sessions=1000):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self._sessions = (
+            OrderedDict()
+        )  # session id -> {"entries": [...], "messages": [...]}
+        self._lock = threading.Lock()
+
+        if self.db_path:
+            self._init_db()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def load(self, session_id):
+        """
+        Return ``(entries, messages)`` for a session.
+
+        ``entries`` is a list of display entries and ``messages`` a list of
+        LangChain messages; both are empty for an unknown session.
+        """
+        session = self._get_session(session_id, refresh=True)
+        with self._lock:
+            entries = [dict(e) for e in session["entries"]]
+            messages = list(session["messages"])
+        return entries, messages_from_dict(messages)
+
+    def append(self, session_id, role, content, type="generic"):
+        """Record one display entry and return it."""
+        entry = {"role": role, "type": type, "content": content}
+        session = self._get_session(session_id)
+        with self._lock:
+            session["entries"].append(entry)
+        if self.db_path:
+            # Numbered inside the single INSERT, so appends from other
+            # processes to the same session never take the same slot.
+            self._db_write(
+                "INSERT INTO conversation_entries (session_id, seq, entry) "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ? FROM conversation_entries "
+                "WHERE session_id = ?",
+                (session_id, json.dumps(entry), session_id),
+            )
+        return entry
+
+    def save_messages(self, session_id, messages):
+        """Replace the session's model-facing message history."""
+        serialized = messages_to_dict(messages)
+        session = self._get_session(session_id)
+        with self._lock:
+            session["messages"] = serialized
+        if self.db_path:
+            self._db_write(
+                "INSERT OR REPLACE INTO conversation_messages (session_id, messages, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(serialized), time.time()),
+            )
+
+    def delete(self, session_id):
+        """Forget a session entirely."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.db_path:
+            self._db_write(
+                "DELETE FROM conversation_entries WHERE session_id = ?", (session_id,)
+            )
+            self._db_write(
+                "DELETE FROM conversation_messages WHERE session_id = ?", (session_id,)
+            )
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _get_session(self, session_id, refresh=False):
+        """Return the cached session; ``refresh`` re-reads it from SQLite first."""
+        if not (refresh and self.db_path):
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    self._sessions.move_to_end(session_id)
+                    return session
+
+        loaded = self._db_load(session_id) if self.db_path else None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if loaded is not None and refresh:
+                # Other processes may have written to the session meanwhile.
+                session = self._sessions[session_id] = loaded
+            elif session is None:
+                # Another thread may have created the session meanwhile.
+                session = loaded or {"entries": [], "messages": []}
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS conversation_entries (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    entry TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS conversation_messages (
+                    session_id TEXT PRIMARY KEY,
+                    messages TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _db_load(self, session_id):
+        try:
+            with self._connect() as conn:
+                entries = conn.execute(
+                    "SELECT entry FROM conversation_entries WHERE session_id = ? ORDER BY seq",
+                    (session_id,),
+                ).fetchall()
+                row = conn.execute(
+                    "SELECT messages FROM conversation_messages WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Conversation read failed for {self.db_path}: {e}")
+            return None
+
+        if not entries and row is None:
+            return None
+        return {
+            "entries": [json.loads(e[0]) for e in entries],
+            "messages": json.loads(row[0]) if row else [],
+        }
+
+    def _db_write(self, sql, params):
+        try:
+            with self._connect() as conn:
+                conn.execute(sql, params)
+        except sqlite3.Error as e:
+            print(f"Conversation write failed for {self.db_path}: {e}")
+
+
+def get_conversation_store():
+    """
+    Get the process-wide conversation store, creating it on first use.
+
+    Set ``CONVERSATION_DB`` to a SQLite file to keep conversations across
+    server restarts; otherwise they live in memory only.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                _store = ConversationStore(
+                    db_path=settings.conversation_db,
+                    max_sessions=settings.conversation_max_sessions,
+                )
+    return _store
@@ -0,0 +1,44 @@
+"""
+Render the chatbot graph diagram used in the README.
+
+Run once after changing the graph, not at app startup:
+
+    python -m utils.draw_graph                      # PNG via the mermaid.ink service
+    python -m utils.draw_graph --format mermaid     # Mermaid source, fully offline
+"""
+
+import argparse
+
+from utils.graph import init_and_load_env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--format",
+        choices=["png", "mermaid"],
+        default="png",
+        help="'png' renders through mermaid.ink; 'mermaid' writes the diagram source without any network call.",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Output path (defaults to static/chatbot_lang_graph.png or .mmd).",
+    )
+    args = parser.parse_args(argv)
+
+    drawable = init_and_load_env().get_graph()
+    if args.format == "png":
+        output = args.output or r"./static/chatbot_lang_graph.png"
+        with open(output, "wb") as f:
+            f.write(drawable.draw_mermaid_png())
+    else:
+        output = args.output or r"./static/chatbot_lang_graph.mmd"
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(drawable.draw_mermaid())
+
+    print(f"Graph diagram written to {output}")
+
+
+if __name__ == "__main__":
+    main()
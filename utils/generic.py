@@ -1,81 +1,202 @@
-import os
-from typing import Annotated
+import json
+import time
+from functools import lru_cache
 
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
-from typing_extensions import TypedDict
+from langchain_core.messages import (
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
 
-from utils.yelp_business_fetch import restaurant_search
-from utils.the_movie_db_fetch import get_movie_recommendations
-
-
-class State(TypedDict):
-    messages: Annotated[list, add_messages]
+from utils.settings import get_settings
+from utils.tracing import span
 
 
+@lru_cache(maxsize=None)
 def load_prompt_from_file(file_path: str) -> str:
-    """Load a prompt from a text file."""
+    """Load a prompt from a text file (cached for the lifetime of the process)."""
     with open(file_path, "r", encoding="utf-8") as file:
         return file.read().strip()
 
 
-def init_and_load_env():
-    load_dotenv()  # Load variables from .env
-
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-    os.environ["YELP_API_KEY"] = os.getenv("YELP_API_KEY")
-    os.environ["THE_MOVIE_DB_API_KEY"] = os.getenv("THE_MOVIE_DB_API_KEY")
-
-    google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not google_api_key:
-        raise ValueError("Google API key is not set in environment variables.")
-
-    yelp_api_key = os.getenv("YELP_API_KEY")
-    if not yelp_api_key:
-        raise ValueError("Yelp API key is not set in environment variables.")
-
-    the_movie_db_api_key = os.getenv("THE_MOVIE_DB_API_KEY")
-    if not the_movie_db_api_key:
-        raise ValueError("TMDB API key is not set in environment variables.")
-
-    # Initialize Google Generative AI client
-    llm = ChatGoogleGenerativeAI(
-        api_key=google_api_key,
-        model="gemini-2.5-flash",
-        temperature=0.3,
-        max_tokens=1000,
-        convert_system_message_to_human=True,
+def get_history_token_budget() -> int:
+    """Get the prompt token budget for chat history (``CHAT_HISTORY_TOKEN_BUDGET``, default 6000)."""
+    return get_settings().chat_history_token_budget
+
+
+def summarize_tool_message(message: ToolMessage, max_items: int = 10) -> ToolMessage:
+    """
+    Replace a tool result's raw JSON payload with a one-line summary.
+
+    The summary keeps what the model needs to refer back to earlier results
+    (names/titles and their ratings) without re-sending full API payloads.
+    """
+    try:
+        payload = json.loads(message.content)
+    except (TypeError, ValueError):
+        return message.model_copy(update={"content": str(message.content)[:500]})
+
+    if isinstance(payload, dict) and "recommendations" in payload:
+        items = payload["recommendations"]
+        header = f"Recommendations for {payload.get('found_title')!r}"
+    elif isinstance(payload, list):
+        items = payload
+        header = "Results"
+    else:
+        return message.model_copy(update={"content": json.dumps(payload)[:500]})
+
+    entries = []
+    for item in items[:max_items]:
+        if isinstance(item, dict):
+            label = item.get("name") or item.get("title") or "?"
+            entries.append(f"{label} ({item.get('rating', 'N/A')})")
+    more = f" and {len(items) - max_items} more" if len(items) > max_items else ""
+    summary = f"[{message.name} summary] {header}: {'; '.join(entries) or 'none'}{more}"
+    return message.model_copy(update={"content": summary})
+
+
+def trim_history(messages: list, max_tokens: int | None = None) -> list:
+    """
+    Bound a conversation to a token budget before sending it to the model.
+
+    - Leading system messages are always kept.
+    - Tool results from earlier turns are replaced by compact summaries; the
+      current turn's results are left intact so the model can present them.
+    - Whole turns are dropped oldest-first until the history fits, so a tool
+      call is never separated from its results. The latest turn is always kept.
+    """
+    max_tokens = max_tokens or get_history_token_budget()
+
+    last_human = max(
+        (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0
+    )
+    compacted = [
+        summarize_tool_message(m) if isinstance(m, ToolMessage) and i < last_human else m
+        for i, m in enumerate(messages)
+    ]
+
+    trimmed = trim_messages(
+        compacted,
+        max_tokens=max_tokens,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+        include_system=True,
+        allow_partial=False,
     )
 
-    tools = [restaurant_search, get_movie_recommendations]
-
-    llm_with_tools = llm.bind_tools(tools=tools)
-
-    # Node definition for the tool invocation
-    def chatbot(state: State):
-        return {"messages": [llm_with_tools.invoke(state["messages"])]}
-
-    # Build the graph
-    builder = StateGraph(State)
-    builder.add_node("chatbot", chatbot)
-    builder.add_edge(START, "chatbot")
-    builder.add_node("tools", ToolNode(tools=tools))
-
-    ## adding edges
-    builder.add_conditional_edges("chatbot", tools_condition)
-    builder.add_edge("tools", "chatbot")
-    builder.add_edge("chatbot", END)
-
-    graph = builder.compile()
+    # Never drop the turn being answered, even if it alone exceeds the budget.
+    if last_human and not any(m is compacted[last_human] for m in trimmed):
+        system = [m for m in compacted[:last_human] if isinstance(m, SystemMessage)]
+        trimmed = system + compacted[last_human:]
+    return trimmed
+
+
+def message_text(message) -> str:
+    """Return the plain text of a message whose content may be a list of parts."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, str) or part.get("type") == "text"
+    )
 
-    # Get the PNG bytes from the Mermaid graph
-    png_bytes = graph.get_graph().draw_mermaid_png()
 
-    # Save to file
-    with open(r"./static/chatbot_lang_graph.png", "wb") as f:
-        f.write(png_bytes)
-    
-    return graph
+def stream_chat_events(graph, state, config=None):
+    """
+    Run one chat turn and yield UI events as soon as they are available.
+
+    The graph is streamed with ``stream_mode=["messages", "updates", "custom"]``
+    so model tokens and partial tool results arrive as they are produced
+    instead of once per finished node.
+
+    Yields:
+        tuple[str, Any]:
+            - ``("token", str)``: a text delta from the `chatbot` node.
+            - ``("message", AIMessage)``: a finished `chatbot` message (or a
+              `router` tool call / templated `summarize` reply); any tokens
+              streamed before it belong to this message.
+            - ``("progress", dict)``: partial results of a running tool, e.g.
+              the ranked restaurants found so far by a paged Yelp search
+              (``type``, ``query`` and ``businesses``); superseded by the
+              next ``tools`` event.
+            - ``("tools", list[ToolMessage])``: results of one `tools` step.
+            - ``("done", dict)``: timings for the turn, ``time_to_first_token``
+              (seconds, `None` if no text was produced) and ``total_time``.
+    """
+    timer = _TurnTimer()
+
+    # Every node, tool and HTTP span of this turn nests under the `turn` span.
+    with span("turn") as turn:
+        for mode, payload in graph.stream(
+            state, config=config, stream_mode=["messages", "updates", "custom"]
+        ):
+            for event in _chat_events(mode, payload):
+                yield timer.observe(event)
+        timings = timer.finish(turn)
+    yield "done", timings
+
+
+async def astream_chat_events(graph, state, config=None):
+    """Async counterpart of `stream_chat_events`, driven by ``graph.astream``."""
+    timer = _TurnTimer()
+
+    with span("turn") as turn:
+        async for mode, payload in graph.astream(
+            state, config=config, stream_mode=["messages", "updates", "custom"]
+        ):
+            for event in _chat_events(mode, payload):
+                yield timer.observe(event)
+        timings = timer.finish(turn)
+    yield "done", timings
+
+
+class _TurnTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+
+    def observe(self, event):
+        if event[0] == "token" and self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        return event
+
+    def finish(self, turn):
+        timings = {
+            "time_to_first_token": (
+                self.first_token_at - self.started
+                if self.first_token_at is not None
+                else None
+            ),
+            "total_time": time.perf_counter() - self.started,
+        }
+        turn.set("time_to_first_token", timings["time_to_first_token"])
+        return timings
+
+
+def _chat_events(mode, payload):
+    """Translate one ``(mode, payload)`` item of a graph stream into UI events."""
+    if mode == "messages":
+        chunk, metadata = payload
+        if metadata.get("langgraph_node") != "chatbot":
+            return
+        if not isinstance(chunk, AIMessageChunk):
+            return
+        text = message_text(chunk)
+        if text:
+            yield "token", text
+    elif mode == "updates":
+        for node, update in payload.items():
+            if not update:
+                continue
+            if node in ("chatbot", "router", "summarize"):
+                yield "message", update["messages"][-1]
+            elif node == "tools":
+                yield "tools", update["messages"]
+    elif mode == "custom":
+        if isinstance(payload, dict) and "type" in payload:
+            yield "progress", payload
@@ -0,0 +1,200 @@
+import threading
+from typing import Annotated
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, tools_condition
+from typing_extensions import TypedDict
+
+from utils.generic import trim_history
+from utils.intent_router import (
+    ROUTER_NAME,
+    can_summarize,
+    is_router_enabled,
+    route_intent,
+    summarize_routed_results,
+)
+from utils.rate_limit import get_rate_limiter
+from utils.semantic_cache import get_semantic_cache, lookup_response, store_response
+from utils.settings import get_settings
+from utils.the_movie_db_fetch import get_movie_recommendations
+from utils.tracing import configure_tracing_from_env, increment, span
+from utils.yelp_business_fetch import restaurant_search
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def record_llm_usage(current, messages, response):
+    """Attach prompt size, token usage and tool calls of a model call to its span."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    current.set("prompt_messages", len(messages))
+    current.set("input_tokens", usage.get("input_tokens"))
+    current.set("output_tokens", usage.get("output_tokens"))
+    current.set("tool_calls", len(getattr(response, "tool_calls", None) or []))
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            increment("llm_tokens", usage[kind], type=kind.split("_")[0])
+
+
+def route_node(state: State):
+    """Graph node: turn a fully specified request into a tool call without the model."""
+    with span("router") as current:
+        message = route_intent(state["messages"])
+        current.set("routed", message is not None)
+    return {"messages": [message]} if message is not None else {}
+
+
+def summarize_node(state: State):
+    """Graph node: reply to routed tool results from a template."""
+    with span("summarize"):
+        return {"messages": [summarize_routed_results(state["messages"])]}
+
+
+def after_router(state: State) -> str:
+    last = state["messages"][-1]
+    return (
+        "tools"
+        if isinstance(last, AIMessage) and last.name == ROUTER_NAME
+        else "chatbot"
+    )
+
+
+def after_tools(state: State) -> str:
+    return "summarize" if can_summarize(state["messages"]) else "chatbot"
+
+
+def init_and_load_env(llm=None, checkpointer=None):
+    """
+    Read the settings and build the compiled chatbot graph.
+
+    Args:
+        llm (BaseChatModel, optional): Chat model to use instead of Gemini, e.g.
+            the scripted model in `benchmarks/`. When given, no Google API key
+            is required.
+        checkpointer (BaseCheckpointSaver, optional): Persists each conversation's
+            state by ``thread_id`` (see `server.py`). Without one the caller
+            passes the full history on every turn, as the Streamlit app does.
+    """
+    settings = get_settings()
+    configure_tracing_from_env()
+
+    if not settings.yelp_api_key:
+        raise ValueError("Yelp API key is not set in environment variables.")
+
+    if not settings.tmdb_api_key:
+        raise ValueError("TMDB API key is not set in environment variables.")
+
+    if llm is None:
+        if not settings.google_api_key:
+            raise ValueError("Google API key is not set in environment variables.")
+
+        # The Gemini client is the slowest import here; it's only needed
+        # when no other model is passed in.
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        # Initialize Google Generative AI client
+        llm = ChatGoogleGenerativeAI(
+            api_key=settings.google_api_key,
+            model="gemini-2.5-flash",
+            temperature=0.3,
+            max_tokens=1000,
+            convert_system_message_to_human=True,
+        )
+
+    tools = [restaurant_search, get_movie_recommendations]
+
+    llm_with_tools = llm.bind_tools(tools=tools)
+    # Shared by every session, so bursts queue here instead of coming back as 429s.
+    llm_limiter = get_rate_limiter("gemini")
+    semantic_cache = get_semantic_cache()
+
+    # Node definition for the tool invocation
+    def chatbot(state: State):
+        with span("chatbot") as current:
+            if semantic_cache is not None:
+                # Decided on the full history: trimming may hide earlier turns.
+                cached = lookup_response(semantic_cache, state["messages"])
+                if cached is not None:
+                    current.set("semantic_cache", "hit")
+                    return {"messages": [cached]}
+
+            messages = trim_history(state["messages"])
+            if llm_limiter is not None:
+                llm_limiter.acquire()
+            response = llm_with_tools.invoke(messages)
+            record_llm_usage(current, messages, response)
+            if semantic_cache is not None:
+                store_response(semantic_cache, state["messages"], response)
+        return {"messages": [response]}
+
+    async def achatbot(state: State):
+        with span("chatbot") as current:
+            if semantic_cache is not None:
+                # Decided on the full history: trimming may hide earlier turns.
+                cached = lookup_response(semantic_cache, state["messages"])
+                if cached is not None:
+                    current.set("semantic_cache", "hit")
+                    return {"messages": [cached]}
+
+            messages = trim_history(state["messages"])
+            if llm_limiter is not None:
+                await llm_limiter.aacquire()
+            response = await llm_with_tools.ainvoke(messages)
+            record_llm_usage(current, messages, response)
+            if semantic_cache is not None:
+                store_response(semantic_cache, state["messages"], response)
+        return {"messages": [response]}
+
+    # Build the graph. Both tools ship native coroutines, so when the graph is
+    # driven with `ainvoke`/`astream` the ToolNode gathers parallel tool calls
+    # on the event loop; the sync `invoke`/`stream` path fans them out on a
+    # thread pool. Either way a multi-search turn costs about one slowest call.
+    builder = StateGraph(State)
+    builder.add_node("chatbot", RunnableLambda(chatbot, afunc=achatbot, name="chatbot"))
+    builder.add_node("tools", ToolNode(tools=tools))
+
+    ## adding edges
+    builder.add_conditional_edges("chatbot", tools_condition)
+    builder.add_edge("chatbot", END)
+
+    if is_router_enabled():
+        # Fully specified requests ("cheap mexican in Austin, TX", "movies like
+        # Heat") go straight to the tools and get a templated reply, skipping
+        # both model calls; anything else, or an empty result, goes to the model.
+        builder.add_node("router", route_node)
+        builder.add_node("summarize", summarize_node)
+        builder.add_edge(START, "router")
+        builder.add_conditional_edges("router", after_router, ["tools", "chatbot"])
+        builder.add_conditional_edges("tools", after_tools, ["summarize", "chatbot"])
+        builder.add_edge("summarize", END)
+    else:
+        builder.add_edge(START, "chatbot")
+        builder.add_edge("tools", "chatbot")
+
+    graph = builder.compile(checkpointer=checkpointer)
+
+    # The diagram in static/ is rendered offline with `python -m utils.draw_graph`.
+    return graph
+
+
+def get_shared_graph():
+    """
+    Get the process-wide compiled graph, building it on first use.
+
+    The compiled graph holds no per-conversation state, so every Streamlit
+    session (and thread) can share one instance instead of paying for
+    `init_and_load_env` on each new browser session.
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = init_and_load_env()
+    return _graph
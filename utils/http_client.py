@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.settings import get_settings
+from utils.tracing import span
+
+_session = None
+_session_lock = threading.Lock()
+
+# httpx clients are bound to the event loop they were first used on.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_config():
+    """
+    Get the HTTP client configuration from environment variables.
+
+    - ``HTTP_POOL_CONNECTIONS``: number of per-host connection pools to keep (default 10).
+    - ``HTTP_POOL_MAXSIZE``: max keep-alive connections per host (default 20).
+    - ``HTTP_CONNECT_TIMEOUT``: TCP/TLS connect timeout in seconds (default 3.05).
+    - ``HTTP_READ_TIMEOUT``: read timeout in seconds (default 10).
+    """
+    settings = get_settings()
+    return {
+        "pool_connections": settings.http_pool_connections,
+        "pool_maxsize": settings.http_pool_maxsize,
+        "connect_timeout": settings.http_connect_timeout,
+        "read_timeout": settings.http_read_timeout,
+    }
+
+
+def get_http_session():
+    """
+    Get the process-wide pooled `requests.Session`, creating it on first use.
+
+    Connections are kept alive and reused per host, so repeated Yelp and TMDB
+    calls skip the TCP+TLS handshake. Retries are handled by the callers, so
+    the adapter itself never retries.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                config = get_http_config()
+                adapter = HTTPAdapter(
+                    pool_connections=config["pool_connections"],
+                    pool_maxsize=config["pool_maxsize"],
+                    max_retries=0,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def close_http_session():
+    """Close the shared session and drop its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def http_get(url, params=None, headers=None, timeout=None):
+    """
+    Issue a GET request through the shared pooled session.
+
+    Args:
+        url (str): Request URL.
+        params (dict, optional): Query string parameters.
+        headers (dict, optional): Request headers.
+        timeout (float | tuple, optional): Overrides the configured
+            ``(connect, read)`` timeout.
+
+    Returns:
+        requests.Response: The raw response; status handling is left to the caller.
+    """
+    if timeout is None:
+        config = get_http_config()
+        timeout = (config["connect_timeout"], config["read_timeout"])
+    with span("http.request", url=url) as current:
+        response = get_http_session().get(
+            url, params=params, headers=headers, timeout=timeout
+        )
+        current.set("status", response.status_code)
+    return response
+
+
+def get_async_http_client():
+    """
+    Get the pooled `httpx.AsyncClient` for the running event loop, creating it on first use.
+
+    httpx pools are not per host, so ``HTTP_POOL_MAXSIZE`` bounds keep-alive
+    connections and ``HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE`` bounds the total.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        config = get_http_config()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config["pool_connections"] * config["pool_maxsize"],
+                max_keepalive_connections=config["pool_maxsize"],
+            ),
+            timeout=httpx.Timeout(
+                config["read_timeout"], connect=config["connect_timeout"]
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def ahttp_get(url, params=None, headers=None, timeout=None):
+    """
+    Async counterpart of `http_get` using the event loop's pooled `httpx.AsyncClient`.
+
+    Returns:
+        httpx.Response: The raw response; status handling is left to the caller.
+    """
+    client = get_async_http_client()
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    with span("http.request", url=url) as current:
+        response = await client.get(url, params=params, headers=headers, **kwargs)
+        current.set("status", response.status_code)
+    return response
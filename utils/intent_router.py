@@ -0,0 +1,245 @@
+import re
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from pydantic import ValidationError
+
+from utils.projections import MovieRecord, RestaurantRecord
+from utils.settings import get_settings
+from utils.the_movie_db_fetch import MovieRecommendationToolInput
+from utils.yelp_business_fetch import RestaurantSearchToolInput
+
+ROUTER_NAME = "intent_router"
+
+# Phrase -> `price_tiers` value understood by `restaurant_search`.
+_PRICE_WORDS = {
+    "very expensive": "very expensive",
+    "cheap": "cheap",
+    "inexpensive": "cheap",
+    "affordable": "cheap",
+    "budget": "cheap",
+    "moderately priced": "moderate",
+    "moderate": "moderate",
+    "mid-range": "moderate",
+    "expensive": "expensive",
+    "pricey": "expensive",
+    "upscale": "expensive",
+}
+_PRICE_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(p) for p in _PRICE_WORDS) + r")\b", re.IGNORECASE
+)
+_RESTAURANT_PATTERN = re.compile(
+    r"^(?:(?:find|show|get|recommend|suggest)(?:\s+me)?\s+)?"
+    r"(?:(?:some|a|an|good|the\s+best)\s+)*"
+    r"(?P<cuisine>[a-z][a-z\-]*(?:\s+[a-z][a-z\-]*){0,2}?)\s+"
+    r"(?:(?:food|restaurants?|places?|spots?|cuisine)\s+)?"
+    r"(?:in|near|around)\s+(?P<location>[^?!.]+?)\s*[?!.]*$",
+    re.IGNORECASE,
+)
+_MOVIE_PATTERN = re.compile(
+    r"^(?:(?:recommend|suggest|find|show|give)(?:\s+me)?\s+)?"
+    r"(?:(?:some|any|good|more)\s+)*(?:movies?|films?)\s+"
+    r"(?:like|similar\s+to)\s+(?P<title>.+?)\s*[?!.]*$",
+    re.IGNORECASE,
+)
+_LOCATION_PATTERN = re.compile(
+    r"^[a-z][a-z .'\-]*(?:,\s*[a-z][a-z .'\-]*)?$", re.IGNORECASE
+)
+# Words that mean the "location" is really the start of a longer request.
+_NOT_LOCATION_WORDS = re.compile(
+    r"\b(?:and|or|then|but|with|for|tonight|today|tomorrow|movies?|films?)\b",
+    re.IGNORECASE,
+)
+# Only searches for known cuisines are routed ("cheap flights in Austin" or
+# "I want cheap sushi" must not become a Yelp search); anything else goes to
+# the model, which can still call the tool itself.
+_CUISINE_WORDS = frozenset(
+    "american asian bagels bakery bakeries barbecue bbq bistro brazilian breakfast "
+    "brunch buffet burgers burrito burritos cafe cajun caribbean chicken chinese "
+    "coffee creole cuban curry deli delis dessert desserts dim diner donuts "
+    "dumplings ethiopian filipino fish french fried german greek hawaiian "
+    "indian indonesian irish italian jamaican japanese kebab korean latin "
+    "lebanese malaysian mediterranean mexican middle eastern moroccan nepalese "
+    "noodles pakistani persian peruvian pho pizza poke portuguese ramen salad "
+    "sandwiches seafood soul southern spanish steak steakhouse sum sushi szechuan "
+    "tacos tapas taiwanese tex-mex thai turkish vegan vegetarian vietnamese wings".split()
+)
+# Pronouns, ordinals and conjunctions mean the "title" refers back to earlier
+# results ("more movies like that", "the second one") or carries extra
+# constraints ("Heat but funnier"), which only the model can resolve.
+_NOT_TITLE_WORDS = frozenset(
+    "it that this these those them they one ones first second third fourth fifth "
+    "last previous above other same and but or for".split()
+)
+# A "location" that is really the user ("near me", "in my area") or ends in
+# conversational filler ("in Chicago please").
+_NOT_LOCATION_START = frozenset("me my here us our you your this that the".split())
+_NOT_LOCATION_END = frozenset("please pls thanks thx now asap area".split())
+
+
+def is_router_enabled():
+    """Whether the intent router runs before the model (``INTENT_ROUTER``, default on)."""
+    return get_settings().intent_router
+
+
+def parse_intent(text):
+    """
+    Parse a fully specified request into a tool call.
+
+    Recognizes requests such as "cheap mexican in Austin, TX" or "movies like
+    Heat" and returns ``{"name", "args"}`` validated against the tool's input
+    schema, or `None` when anything is missing or ambiguous.
+    """
+    text = " ".join(text.strip().split())
+
+    match = _MOVIE_PATTERN.match(text)
+    if match:
+        title = match.group("title").strip(" \"'*_")
+        if _NOT_TITLE_WORDS.intersection(_words(title)):
+            return None
+        return _validated(
+            "get_movie_recommendations", MovieRecommendationToolInput, movie_title=title
+        )
+
+    prices = _PRICE_PATTERN.findall(text)
+    if len(prices) != 1:
+        return None
+    rest = " ".join(_PRICE_PATTERN.sub(" ", text).split())
+    match = _RESTAURANT_PATTERN.match(rest)
+    if not match or not _CUISINE_WORDS.issuperset(_words(match.group("cuisine"))):
+        return None
+    location = match.group("location").strip(" ,")
+    location_words = _words(location)
+    if (
+        not _LOCATION_PATTERN.match(location)
+        or _NOT_LOCATION_WORDS.search(location)
+        or len(location_words) > 5
+        or location_words[0] in _NOT_LOCATION_START
+        or location_words[-1] in _NOT_LOCATION_END
+    ):
+        return None
+    return _validated(
+        "restaurant_search",
+        RestaurantSearchToolInput,
+        cuisine=match.group("cuisine").lower(),
+        location=location,
+        price_tiers=_PRICE_WORDS[prices[0].lower()],
+    )
+
+
+def _words(text):
+    return re.findall(r"[a-z][a-z\-']*", text.lower())
+
+
+def _validated(name, schema, **args):
+    if not all(isinstance(v, str) and v.strip() for v in args.values()):
+        return None
+    try:
+        return {"name": name, "args": schema(**args).model_dump()}
+    except ValidationError:
+        return None
+
+
+def route_intent(messages):
+    """Return a tool-calling `AIMessage` for the user's latest message, or `None`."""
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    content = messages[-1].content
+    if not isinstance(content, str):
+        return None
+    call = parse_intent(content)
+    if call is None:
+        return None
+    return AIMessage(
+        content="",
+        name=ROUTER_NAME,
+        tool_calls=[{**call, "id": f"call_{uuid.uuid4().hex}"}],
+    )
+
+
+def _routed_step(messages):
+    """Return the router's `AIMessage` and the tool results answering it, if the last step was routed."""
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if isinstance(message, AIMessage):
+            if message.name != ROUTER_NAME or not message.tool_calls:
+                return None, []
+            return message, [m for m in messages[i + 1 :] if isinstance(m, ToolMessage)]
+    return None, []
+
+
+def can_summarize(messages):
+    """Whether the last tool step was routed and every call returned results to template."""
+    call_message, results = _routed_step(messages)
+    if call_message is None or not results:
+        return False
+    for result in results:
+        artifact = result.artifact
+        if result.status == "error" or not artifact:
+            return False
+        if isinstance(artifact, dict) and not artifact.get("recommendations"):
+            return False
+    return True
+
+
+def summarize_routed_results(messages, max_items=5):
+    """Write the reply for a routed tool step from a template instead of the model."""
+    call_message, results = _routed_step(messages)
+    args_by_id = {call["id"]: call["args"] for call in call_message.tool_calls}
+    parts = []
+    for result in results:
+        args = args_by_id.get(result.tool_call_id, {})
+        if result.name == "get_movie_recommendations":
+            parts.append(_movie_summary(result.artifact, max_items))
+        elif result.name == "restaurant_search":
+            parts.append(_restaurant_summary(args, result.artifact, max_items))
+    return AIMessage(content="\n\n".join(parts), name=ROUTER_NAME)
+
+
+def _movie_summary(result, max_items):
+    lines = [f"Since you enjoyed *{result['found_title']}*, you might like:", ""]
+    for i, movie in enumerate(result["recommendations"][:max_items], start=1):
+        record = MovieRecord.from_recommendation(movie)
+        details = " · ".join(
+            d
+            for d in (
+                record.year,
+                f"⭐ {record.rating}" if record.rating is not None else None,
+                (record.language or "").upper() or None,
+            )
+            if d
+        )
+        lines.append(f"{i}. **{record.title}**" + (f" ({details})" if details else ""))
+    top = result["recommendations"][0].get("title")
+    lines += [
+        "",
+        f'Want to go down the rabbit hole? Ask for "movies like {top}" and '
+        "I'll get a whole new list based on it! 🎬",
+    ]
+    return "\n".join(lines)
+
+
+def _restaurant_summary(args, businesses, max_items):
+    lines = [
+        f"Here are some {args.get('price_tiers', '')} {args.get('cuisine', '')} spots "
+        f"in {args.get('location', '')}:",
+        "",
+    ]
+    for i, business in enumerate(businesses[:max_items], start=1):
+        record = RestaurantRecord.from_yelp(business)
+        details = " · ".join(
+            d
+            for d in (
+                f"⭐ {record.rating}" if record.rating is not None else None,
+                f"{record.review_count:,} reviews" if record.review_count else None,
+                record.price,
+                record.address or None,
+            )
+            if d
+        )
+        lines.append(f"{i}. **{record.name}**" + (f" — {details}" if details else ""))
+    lines += [
+        "",
+        "Want me to compare another cuisine or price range, or find a movie for after dinner? 🍽️🎬",
+    ]
+    return "\n".join(lines)
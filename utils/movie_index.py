@@ -0,0 +1,212 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+
+from utils.settings import get_settings
+
+# Only a parenthesized year is a filter: "Blade Runner 2049" and "Wonder
+# Woman 1984" end in numbers that are part of the title.
+_YEAR_SUFFIX = re.compile(r"\s*\(((?:19|20)\d{2})\)\s*$")
+# Bumped when `index_key` changes, so files keyed the old way are re-keyed.
+_FORMAT_VERSION = 2
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def normalize_title(title):
+    """Normalize a movie title for use as a cache key."""
+    return " ".join(title.strip().strip("\"'").casefold().split())
+
+
+def index_key(title):
+    """
+    Loose matching key: normalized and punctuation-free.
+
+    Articles are kept: "The Heat" and "Heat", or "Thing" and "The Thing",
+    are different films.
+    """
+    return re.sub(r"[^\w]+", " ", normalize_title(title)).strip()
+
+
+def split_year(query):
+    """Split ``"Heat (1995)"`` into ``("Heat", "1995")``; other titles get no year."""
+    match = _YEAR_SUFFIX.search(query)
+    if match and match.start() > 0:
+        return query[: match.start()], match.group(1)
+    return query, None
+
+
+class MovieIndex:
+    """
+    Local title -> TMDB movie ID index used to skip `/search/movie`.
+
+    Entries come from search results and from every recommendation response,
+    so titles the user picks from a previous list resolve without a network
+    call. Lookups match on a loose key (case and punctuation ignored) or a
+    query seen before, and disambiguate same-titled movies by an
+    explicit year in the query, then by TMDB popularity. There is no fuzzy
+    matching: a near miss ("Alien" vs "Aliens") may be a different movie, so
+    it goes to `/search/movie` instead.
+
+    The index is bounded to ``max_entries`` titles (oldest dropped first) and,
+    when ``path`` is set, persisted to a JSON file at most every
+    ``save_interval`` seconds and at interpreter exit.
+    """
+
+    def __init__(self, path=None, max_entries=50000, save_interval=30):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self._titles = {}  # index key -> {movie id: entry}
+        self._aliases = {}  # index key of a past query -> [title key, movie id]
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        if self.path:
+            self.load()
+            atexit.register(self.save)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._titles)
+
+    def add_many(self, movies):
+        """Index TMDB movie dicts with ``id``, ``title`` and optional ``release_date``/``popularity``."""
+        with self._lock:
+            for movie in movies:
+                if movie.get("id") is None or not movie.get("title"):
+                    continue
+                key = index_key(movie["title"])
+                if not key:
+                    continue
+                self._titles.setdefault(key, {})[movie["id"]] = {
+                    "id": movie["id"],
+                    "title": movie["title"],
+                    "year": (movie.get("release_date") or "")[:4] or None,
+                    "popularity": movie.get("popularity") or 0,
+                }
+                self._dirty = True
+            while len(self._titles) > self.max_entries:
+                self._titles.pop(next(iter(self._titles)))
+        self._maybe_save()
+
+    def add_alias(self, query, match):
+        """Remember that ``query`` resolved to ``match`` (``{"id", "title"}``)."""
+        key = index_key(query)
+        if not key:
+            return
+        title_key = index_key(match["title"])
+        with self._lock:
+            self._aliases[key] = [title_key, match["id"]]
+            self._titles.setdefault(title_key, {}).setdefault(
+                match["id"],
+                {
+                    "id": match["id"],
+                    "title": match["title"],
+                    "year": None,
+                    "popularity": 0,
+                },
+            )
+            self._dirty = True
+        self._maybe_save()
+
+    def resolve(self, query):
+        """Return ``{"id", "title"}`` for ``query``, or `None` if the index can't answer it."""
+        title, year = split_year(query)
+        key = index_key(title)
+        if not key:
+            return None
+
+        with self._lock:
+            candidates = self._titles.get(key)
+            if not candidates and year is None and key in self._aliases:
+                title_key, movie_id = self._aliases[key]
+                entry = self._titles.get(title_key, {}).get(movie_id)
+                candidates = {movie_id: entry} if entry else None
+            if not candidates:
+                return None
+            entries = list(candidates.values())
+
+        if year is not None:
+            entries = [e for e in entries if e["year"] == year]
+            if not entries:
+                return None
+        best = max(entries, key=lambda e: e["popularity"])
+        return {"id": best["id"], "title": best["title"]}
+
+    def load(self):
+        """Merge entries from the JSON file at ``path``, if it exists."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not load movie index from {self.path}: {e}")
+            return
+
+        current = data.get("version") == _FORMAT_VERSION
+        with self._lock:
+            for entries in data.get("titles", {}).values():
+                for entry in entries:
+                    # Re-keyed from the title, in case the key format changed.
+                    bucket = self._titles.setdefault(index_key(entry["title"]), {})
+                    bucket.setdefault(entry["id"], entry)
+            if current:
+                # Older aliases may point at keys that merged different films.
+                for key, alias in data.get("aliases", {}).items():
+                    self._aliases.setdefault(key, alias)
+
+    def save(self):
+        """Atomically write the index to ``path`` if it changed."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": _FORMAT_VERSION,
+                "titles": {k: list(v.values()) for k, v in self._titles.items()},
+                "aliases": dict(self._aliases),
+            }
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save movie index to {self.path}: {e}")
+
+    def _maybe_save(self):
+        if self.path and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+
+def get_movie_index():
+    """
+    Get the process-wide movie index, creating it on first use.
+
+    Persisted to ``TMDB_INDEX_PATH`` (default ``.cache/tmdb_movie_index.json``;
+    set it empty to keep the index in memory only) and bounded by
+    ``TMDB_INDEX_MAX_ENTRIES`` (default 50000).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                settings = get_settings()
+                _index = MovieIndex(
+                    path=settings.tmdb_index_path,
+                    max_entries=settings.tmdb_index_max_entries,
+                )
+    return _index
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.retry import CircuitBreaker
+from utils.tracing import increment, span
+
+
+class Prefetcher:
+    """
+    Warm a cache in the background on a small bounded thread pool.
+
+    Prefetching is best effort and always yields to user traffic: keys that
+    are already cached or in flight are skipped, new work is dropped once
+    ``max_pending`` jobs are queued, and nothing is scheduled while the
+    upstream's circuit breaker is not closed or has recently seen failures.
+
+    Args:
+        fetch (Callable[[Hashable], Any]): Fetches and caches one key.
+        is_cached (Callable[[Hashable], bool]): Returns whether a key is already warm.
+        breaker (CircuitBreaker, optional): Upstream breaker consulted before scheduling.
+        max_workers (int): Size of the background thread pool.
+        max_pending (int): Max queued plus running jobs.
+        name (str): Label used in spans and counters.
+    """
+
+    def __init__(
+        self,
+        fetch,
+        is_cached,
+        breaker=None,
+        max_workers=2,
+        max_pending=16,
+        name="prefetch",
+    ):
+        self.fetch = fetch
+        self.is_cached = is_cached
+        self.breaker = breaker
+        self.max_pending = max_pending
+        self.name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def upstream_is_healthy(self):
+        breaker = self.breaker
+        return breaker is None or (
+            breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+        )
+
+    def schedule(self, keys):
+        """Queue ``keys`` for prefetching; returns the keys actually scheduled."""
+        if not self.upstream_is_healthy():
+            increment("prefetch_skipped", prefetcher=self.name, reason="upstream")
+            return []
+
+        scheduled = []
+        for key in keys:
+            with self._lock:
+                if key in self._in_flight:
+                    continue
+                if len(self._in_flight) >= self.max_pending:
+                    increment(
+                        "prefetch_skipped", prefetcher=self.name, reason="queue_full"
+                    )
+                    break
+                if self.is_cached(key):
+                    continue
+                self._in_flight.add(key)
+            self._executor.submit(self._run, key)
+            scheduled.append(key)
+        return scheduled
+
+    def _run(self, key):
+        try:
+            # Re-check: user traffic may have warmed it or tripped the breaker meanwhile.
+            if self.is_cached(key) or not self.upstream_is_healthy():
+                return
+            with span("prefetch", prefetcher=self.name, key=str(key)):
+                self.fetch(key)
+            increment("prefetch_completed", prefetcher=self.name)
+        except Exception:
+            increment("prefetch_failed", prefetcher=self.name)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
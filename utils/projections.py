@@ -0,0 +1,93 @@
+import json
+from dataclasses import asdict, dataclass
+
+from utils.settings import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class RestaurantRecord:
+    """The subset of a Yelp business the model needs to describe a restaurant."""
+
+    name: str
+    rating: float | None
+    review_count: int | None
+    price: str | None
+    address: str
+    cuisine: str
+
+    @classmethod
+    def from_yelp(cls, business: dict) -> "RestaurantRecord":
+        location = business.get("location") or {}
+        address = ", ".join(
+            part for part in (location.get("address1"), location.get("city")) if part
+        )
+        return cls(
+            name=business.get("name", ""),
+            rating=business.get("rating"),
+            review_count=business.get("review_count"),
+            price=business.get("price"),
+            address=address,
+            cuisine=", ".join(cat["title"] for cat in business.get("categories", [])),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MovieRecord:
+    """The subset of a TMDB recommendation the model needs to describe a movie."""
+
+    title: str
+    rating: float | None
+    language: str | None
+    year: str | None
+
+    @classmethod
+    def from_recommendation(cls, movie: dict) -> "MovieRecord":
+        rating = movie.get("rating")
+        return cls(
+            title=movie.get("title", ""),
+            rating=round(rating, 1) if isinstance(rating, (int, float)) else None,
+            language=movie.get("language"),
+            year=(movie.get("release_date") or "")[:4] or None,
+        )
+
+
+def get_max_model_items() -> int:
+    """Get the max records sent to the model per tool call (``TOOL_RESULT_MAX_ITEMS``, default 10)."""
+    return get_settings().tool_result_max_items
+
+
+def to_model_content(payload) -> str:
+    """Serialize records (or a dict containing records) as compact JSON for the model."""
+
+    def convert(value):
+        if isinstance(value, (RestaurantRecord, MovieRecord)):
+            return {k: v for k, v in asdict(value).items() if v is not None}
+        if isinstance(value, dict):
+            return {k: convert(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [convert(v) for v in value]
+        return value
+
+    return json.dumps(convert(payload), separators=(",", ":"), ensure_ascii=False)
+
+
+def project_restaurants(businesses: list[dict]) -> str:
+    """Project raw Yelp businesses into the compact tool content sent to the model."""
+    records = [
+        RestaurantRecord.from_yelp(b) for b in businesses[: get_max_model_items()]
+    ]
+    return to_model_content(records)
+
+
+def project_movie_recommendations(result: dict) -> str:
+    """Project a `get_movie_recommendations` result into the compact tool content sent to the model."""
+    recommendations = result.get("recommendations", [])
+    max_items = get_max_model_items()
+    records = [MovieRecord.from_recommendation(m) for m in recommendations[:max_items]]
+    return to_model_content(
+        {
+            "found_title": result.get("found_title"),
+            "recommendations": records,
+            "total": len(recommendations),
+        }
+    )
@@ -0,0 +1,199 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.settings import get_settings
+from utils.tracing import increment, span
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call can't get a rate-limit slot within its allowed wait."""
+
+
+class TokenBucket:
+    """
+    Proactive client-side rate limiter for one upstream.
+
+    Allows ``rate`` calls per second on average with bursts of up to
+    ``burst`` calls. Callers that find the bucket empty reserve the next free
+    slot and sleep until it, so waiters are served strictly in arrival order
+    and a burst is spread out instead of hitting the upstream at once and
+    coming back as 429s.
+
+    The bucket is tracked as a single "theoretical arrival time" (GCRA), which
+    makes a reservation one comparison under a lock and lets `SQLiteTokenBucket`
+    share the same state between processes.
+
+    Args:
+        name (str): Upstream name used in spans and counters.
+        rate (float): Sustained calls per second.
+        burst (int): Calls allowed back to back when the bucket is full.
+        max_wait (float): Default longest wait for a slot, in seconds.
+    """
+
+    def __init__(self, name, rate, burst=1, max_wait=10.0):
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive.")
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self.max_wait = max_wait
+        self._tat = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self):
+        return 1.0 / self.rate
+
+    def _clock(self):
+        return time.monotonic()
+
+    @contextmanager
+    def _state(self):
+        """Yield a one-item list holding the bucket state; writes to it are kept."""
+        with self._lock:
+            state = [self._tat]
+            yield state
+            self._tat = state[0]
+
+    def reserve(self, timeout=None):
+        """
+        Reserve the next free slot.
+
+        Returns the seconds to wait before calling, or `None` (nothing
+        reserved) if that wait would exceed ``timeout`` (default ``max_wait``).
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        with self._state() as state:
+            now = self._clock()
+            tat = max(state[0], now) + self.interval
+            wait = tat - self.burst * self.interval - now
+            if wait > timeout:
+                return None
+            state[0] = tat
+        return max(0.0, wait)
+
+    def defer(self, seconds):
+        """Hold back every caller for ``seconds``, e.g. after a 429 with `Retry-After`."""
+        with self._state() as state:
+            until = self._clock() + seconds + (self.burst - 1) * self.interval
+            state[0] = max(state[0], until)
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now; never waits."""
+        return self._reserve_or_raise(0.0, raise_exc=False) is not None
+
+    def acquire(self, timeout=None):
+        """Wait for a slot; raises `RateLimitExceeded` if it's more than ``timeout`` away."""
+        wait = self._reserve_or_raise(timeout)
+        if wait > 0:
+            with span("rate_limit.wait", limiter=self.name, wait=wait):
+                time.sleep(wait)
+
+    async def aacquire(self, timeout=None):
+        """Async counterpart of `acquire`; waits with `asyncio.sleep`."""
+        wait = self._reserve_or_raise(timeout)
+        if wait > 0:
+            with span("rate_limit.wait", limiter=self.name, wait=wait):
+                await asyncio.sleep(wait)
+
+    def _reserve_or_raise(self, timeout, raise_exc=True):
+        wait = self.reserve(timeout)
+        if wait is None:
+            increment("rate_limit_rejected", limiter=self.name)
+            if raise_exc:
+                raise RateLimitExceeded(
+                    f"Rate limit for {self.name} exceeded; no slot within the allowed wait."
+                )
+        elif wait > 0:
+            increment("rate_limit_waits", limiter=self.name)
+        return wait
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    `TokenBucket` whose state lives in a SQLite file, so several worker
+    processes on one host share a single budget per upstream.
+
+    Each reservation is one short ``BEGIN IMMEDIATE`` transaction on the
+    ``rate_limits`` table; wall-clock time is used so processes agree on it.
+    """
+
+    def __init__(
+        self, name, rate, burst=1, max_wait=10.0, db_path="rate_limits.sqlite3"
+    ):
+        super().__init__(name, rate, burst=burst, max_wait=max_wait)
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, tat REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _clock(self):
+        return time.time()
+
+    @contextmanager
+    def _state(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tat FROM rate_limits WHERE name = ?", (self.name,)
+                ).fetchone()
+                state = [row[0] if row else 0.0]
+                yield state
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (name, tat) VALUES (?, ?)",
+                    (self.name, state[0]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+def get_rate_limiter(name):
+    """
+    Get the process-wide rate limiter for an upstream ("yelp", "tmdb", "gemini").
+
+    Configured by ``<NAME>_RATE_LIMIT`` (calls per second; unset or 0 disables
+    limiting and returns `None`) and ``<NAME>_RATE_BURST`` (default: one
+    second's worth of calls). ``RATE_LIMIT_MAX_WAIT`` (default 10 seconds)
+    bounds how long a call queues for a slot, and ``RATE_LIMIT_DB`` shares the
+    buckets between processes through a SQLite file.
+    """
+    with _limiters_lock:
+        if name in _limiters:
+            return _limiters[name]
+
+        settings = get_settings()
+        limiter = None
+        if name in settings.rate_limits:
+            rate, burst = settings.rate_limits[name]
+            config = {
+                "rate": rate,
+                "burst": burst,
+                "max_wait": settings.rate_limit_max_wait,
+            }
+            if settings.rate_limit_db:
+                limiter = SQLiteTokenBucket(
+                    name, db_path=settings.rate_limit_db, **config
+                )
+            else:
+                limiter = TokenBucket(name, **config)
+        _limiters[name] = limiter
+        return limiter
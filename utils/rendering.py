@@ -0,0 +1,160 @@
+from functools import lru_cache
+from html import escape
+from urllib.parse import quote_plus
+
+from utils.settings import get_settings
+
+# Emitted once per page by `page_css()`; cards only carry class names.
+CARD_CSS = """
+.result-row {
+    display: flex;
+    flex-direction: row;
+    overflow-x: auto;
+    padding: 10px 0;
+    -webkit-overflow-scrolling: touch;
+    scrollbar-width: thin;
+    scrollbar-color: #A9A9A9 #F1F0F0;
+}
+.result-more > summary,
+.card-map > summary {
+    cursor: pointer;
+    color: var(--text-color);
+}
+.result-card {
+    border: 1px solid var(--border-color);
+    background-color: var(--secondary-background-color);
+    border-radius: 10px;
+    padding: 15px;
+    margin: 5px;
+    box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
+    display: flex;
+    flex-direction: column;
+    justify-content: space-between;
+    color: var(--text-color);
+}
+.result-card p { margin: 4px 0; color: var(--text-color); }
+.result-card a { text-decoration: none; color: var(--text-color); }
+.movie-card { min-width: 250px; max-width: 300px; }
+.restaurant-card { min-width: 300px; }
+.movie-poster {
+    border-radius: 8px;
+    overflow: hidden;
+    margin-bottom: 10px;
+    text-align: center;
+}
+.movie-poster img { width: 100%; height: auto; display: block; }
+.card-map { margin: 10px 0; }
+.card-map iframe { border: 0; border-radius: 8px; margin-top: 6px; }
+"""
+
+
+def page_css():
+    """Return the `<style>` block shared by every result card on the page."""
+    return f"<style>{CARD_CSS}</style>"
+
+
+def get_results_page_size():
+    """Cards shown per row before the rest are folded away (``RESULTS_PAGE_SIZE``, default 6)."""
+    return get_settings().results_page_size
+
+
+def movie_card(movie):
+    """Return the HTML for a single movie card with its poster."""
+    return _movie_card(
+        movie.get("id"),
+        movie["title"],
+        movie.get("rating"),
+        movie.get("language") or "",
+        movie.get("poster-img") or "",
+    )
+
+
+def restaurant_card(restaurant):
+    """Return the HTML for a single restaurant card with a click-to-load map."""
+    location = restaurant.get("location") or {}
+    address = ", ".join(
+        part
+        for part in (
+            location.get("address1"),
+            location.get("city"),
+            " ".join(p for p in (location.get("state"), location.get("zip_code")) if p),
+        )
+        if part
+    )
+    return _restaurant_card(
+        restaurant.get("id"),
+        restaurant["name"],
+        restaurant.get("rating", "N/A"),
+        address,
+        restaurant.get("price", "N/A"),
+        restaurant.get("display_phone", "N/A"),
+        ", ".join(cat["title"] for cat in restaurant.get("categories", [])),
+    )
+
+
+def result_rows(cards, page_size=None):
+    """
+    Lay out card HTML in horizontally scrolling rows.
+
+    The first ``page_size`` cards are shown; each further page sits in a
+    collapsed `<details>` block, so its posters and maps aren't fetched unless
+    the user opens it.
+    """
+    page_size = page_size or get_results_page_size()
+    pages = [cards[i : i + page_size] for i in range(0, len(cards), page_size)]
+    if not pages:
+        return ""
+
+    html = [f'<div class="result-row">{"".join(pages[0])}</div>']
+    for shown, page in enumerate(pages[1:], start=1):
+        html.append(
+            f'<details class="result-more"><summary>Show {len(page)} more '
+            f"({shown * page_size + 1}-{shown * page_size + len(page)} of {len(cards)})</summary>"
+            f'<div class="result-row">{"".join(page)}</div></details>'
+        )
+    return "".join(html)
+
+
+def render_movie_results(movies, page_size=None):
+    """Return the HTML for a list of recommended movies."""
+    return result_rows([movie_card(m) for m in movies], page_size)
+
+
+def render_restaurant_results(restaurants, page_size=None):
+    """Return the HTML for a list of restaurants."""
+    return result_rows([restaurant_card(r) for r in restaurants], page_size)
+
+
+@lru_cache(maxsize=1024)
+def _movie_card(movie_id, title, rating, language, poster_img):
+    title = escape(title)
+    rating_text = f"{rating:.1f}" if isinstance(rating, (int, float)) else "N/A"
+    return (
+        f'<div class="result-card movie-card" data-id="{escape(str(movie_id))}">'
+        f"<h4>🎬 {title}</h4>"
+        f'<div class="movie-poster"><img src="{escape(poster_img)}" alt="{title} Poster" loading="lazy"></div>'
+        f"<p><strong>⭐ Rating:</strong> {rating_text}</p>"
+        f"<p><strong>🌎 Language:</strong> {escape(language.upper())}</p>"
+        "</div>"
+    )
+
+
+@lru_cache(maxsize=1024)
+def _restaurant_card(business_id, name, rating, address, price, phone, cuisine):
+    query = quote_plus(address)
+    # The embed only loads once the <details> is opened; the closed summary
+    # is a lightweight placeholder instead of one live map per card.
+    return (
+        f'<div class="result-card restaurant-card" data-id="{escape(str(business_id))}">'
+        f'<h4><a href="https://maps.google.com/?q={query}" target="_blank">{escape(name)}</a></h4>'
+        f'<details class="card-map"><summary>🗺️ Show map</summary>'
+        f'<iframe src="https://maps.google.com/maps?q={query}&amp;output=embed" width="100%" '
+        'height="150" allowfullscreen="" loading="lazy" referrerpolicy="no-referrer"></iframe>'
+        "</details>"
+        f"<p><strong>⭐ Rating:</strong> {escape(str(rating))}</p>"
+        f"<p><strong>📍 Address:</strong> {escape(address)}</p>"
+        f"<p><strong>💰 Price:</strong> {escape(str(price))}</p>"
+        f"<p><strong>📞 Phone:</strong> {escape(str(phone))}</p>"
+        f"<p><strong>🍽️ Cuisine:</strong> {escape(cuisine)}</p>"
+        "</div>"
+    )
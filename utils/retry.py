@@ -0,0 +1,357 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+
+from utils.rate_limit import get_rate_limiter
+from utils.settings import get_settings
+from utils.tracing import increment, span
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream's circuit is open."""
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by an attempt count and a
+    total deadline.
+
+    Args:
+        max_attempts (int): Total attempts including the first one.
+        base_delay (float): Backoff for the first retry, in seconds.
+        max_delay (float): Upper bound for a single wait, including `Retry-After`.
+        deadline (float): Total seconds a call may spend across attempts and waits.
+        retry_statuses (Iterable[int]): HTTP statuses treated as transient.
+        retry_exceptions (tuple[type[Exception]]): Exceptions treated as transient.
+        rate_limit_wait (float, optional): Longest wait for a rate-limit slot per
+            attempt; defaults to the limiter's own ``max_wait``. Use 0 for
+            best-effort calls that should never queue.
+    """
+
+    def __init__(
+        self,
+        max_attempts=4,
+        base_delay=0.5,
+        max_delay=8.0,
+        deadline=20.0,
+        retry_statuses=RETRYABLE_STATUSES,
+        retry_exceptions=(
+            requests.ConnectionError,
+            requests.Timeout,
+            httpx.TransportError,
+        ),
+        rate_limit_wait=None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("Retry max_attempts must be at least 1.")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.rate_limit_wait = rate_limit_wait
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        Build a policy from ``HTTP_RETRY_MAX_ATTEMPTS``, ``HTTP_RETRY_BASE_DELAY``,
+        ``HTTP_RETRY_MAX_DELAY`` and ``HTTP_RETRY_DEADLINE``; keyword arguments win.
+        """
+        settings = get_settings()
+        config = {
+            "max_attempts": settings.http_retry_max_attempts,
+            "base_delay": settings.http_retry_base_delay,
+            "max_delay": settings.http_retry_max_delay,
+            "deadline": settings.http_retry_deadline,
+        }
+        config.update(overrides)
+        return cls(**config)
+
+    def backoff(self, attempt):
+        """Return the jittered wait before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.retry_statuses
+
+    def is_retryable_exception(self, exc):
+        return isinstance(exc, self.retry_exceptions)
+
+    def wait_for_response(self, attempt, response):
+        """Return the wait before retrying ``response``, honouring `Retry-After`."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with `CircuitOpenError`. Once ``reset_timeout`` seconds
+    have passed a single trial call is let through (half-open); its outcome
+    closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return self.CLOSED
+        if now - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return whether a call may be attempted right now."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """End a call without a verdict (e.g. cancelled), freeing the half-open trial slot."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def get_circuit_breaker(name):
+    """
+    Get the process-wide circuit breaker for an upstream (e.g. "yelp", "tmdb").
+
+    Thresholds come from ``CIRCUIT_FAILURE_THRESHOLD`` (default 5) and
+    ``CIRCUIT_RESET_TIMEOUT`` (seconds, default 30).
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            settings = get_settings()
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_timeout=settings.circuit_reset_timeout,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def parse_retry_after(value):
+    """Parse a `Retry-After` header (seconds or HTTP date) into seconds, or `None`."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_stats():
+    """Return a snapshot of per-upstream attempt/retry/failure counters."""
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def _count(name, field):
+    with _stats_lock:
+        counts = _stats.setdefault(
+            name, {"attempts": 0, "retries": 0, "failures": 0, "short_circuits": 0}
+        )
+        counts[field] += 1
+    increment(f"upstream_{field}", upstream=name)
+
+
+def request_with_retry(send, upstream, policy=None, breaker=None, limiter=None):
+    """
+    Call ``send()`` until it returns a non-transient response or the policy is exhausted.
+
+    Args:
+        send (Callable[[], requests.Response]): Issues one HTTP request.
+        upstream (str): Upstream name used for the circuit breaker and stats.
+        policy (RetryPolicy, optional): Defaults to `RetryPolicy.from_env()`.
+        breaker (CircuitBreaker, optional): Defaults to `get_circuit_breaker(upstream)`.
+        limiter (TokenBucket, optional): Defaults to `get_rate_limiter(upstream)`;
+            every attempt, retries included, waits for a slot first.
+
+    Returns:
+        requests.Response: The last response received. Callers still check the status.
+
+    Raises:
+        CircuitOpenError: If the upstream's circuit is open.
+        RateLimitExceeded: If no rate-limit slot frees up within the allowed wait.
+        Exception: The last transient exception when no response was ever received,
+            or any non-transient exception raised by ``send``.
+    """
+    policy = policy or RetryPolicy.from_env()
+    breaker = breaker or get_circuit_breaker(upstream)
+    limiter = limiter or get_rate_limiter(upstream)
+    give_up_at = time.monotonic() + policy.deadline
+
+    response = None
+    for attempt in range(policy.max_attempts):
+        if limiter is not None:
+            # Before the breaker: a rejected half-open trial must not stay "in flight".
+            limiter.acquire(_rate_limit_timeout(policy, limiter, give_up_at))
+        if not breaker.allow():
+            _count(upstream, "short_circuits")
+            raise CircuitOpenError(f"Circuit for {upstream} is open; failing fast.")
+
+        _count(upstream, "attempts")
+        try:
+            response = send()
+        except Exception as e:
+            # Any exception is a failed call, so a half-open trial always ends.
+            breaker.record_failure()
+            _count(upstream, "failures")
+            if not policy.is_retryable_exception(e):
+                raise
+            wait = policy.backoff(attempt)
+            if not _should_retry(policy, attempt, wait, give_up_at):
+                raise
+        except BaseException:
+            # Cancelled or interrupted: says nothing about the upstream.
+            breaker.release_trial()
+            raise
+        else:
+            if not policy.is_retryable_status(response.status_code):
+                breaker.record_success()
+                return response
+
+            breaker.record_failure()
+            _count(upstream, "failures")
+            wait = policy.wait_for_response(attempt, response)
+            if limiter is not None and response.status_code == 429:
+                # Hold every session back, not just this caller.
+                limiter.defer(wait)
+            if not _should_retry(policy, attempt, wait, give_up_at):
+                break
+
+        _count(upstream, "retries")
+        with span("retry.wait", upstream=upstream, attempt=attempt + 1, wait=wait):
+            time.sleep(wait)
+
+    return response
+
+
+async def arequest_with_retry(send, upstream, policy=None, breaker=None, limiter=None):
+    """
+    Async counterpart of `request_with_retry`; waits with `asyncio.sleep`.
+
+    Args:
+        send (Callable[[], Awaitable[httpx.Response]]): Issues one HTTP request.
+        upstream, policy, breaker, limiter: See `request_with_retry`.
+    """
+    policy = policy or RetryPolicy.from_env()
+    breaker = breaker or get_circuit_breaker(upstream)
+    limiter = limiter or get_rate_limiter(upstream)
+    give_up_at = time.monotonic() + policy.deadline
+
+    response = None
+    for attempt in range(policy.max_attempts):
+        if limiter is not None:
+            # Before the breaker: a rejected half-open trial must not stay "in flight".
+            await limiter.aacquire(_rate_limit_timeout(policy, limiter, give_up_at))
+        if not breaker.allow():
+            _count(upstream, "short_circuits")
+            raise CircuitOpenError(f"Circuit for {upstream} is open; failing fast.")
+
+        _count(upstream, "attempts")
+        try:
+            response = await send()
+        except Exception as e:
+            # Any exception is a failed call, so a half-open trial always ends.
+            breaker.record_failure()
+            _count(upstream, "failures")
+            if not policy.is_retryable_exception(e):
+                raise
+            wait = policy.backoff(attempt)
+            if not _should_retry(policy, attempt, wait, give_up_at):
+                raise
+        except BaseException:
+            # Cancelled or interrupted: says nothing about the upstream.
+            breaker.release_trial()
+            raise
+        else:
+            if not policy.is_retryable_status(response.status_code):
+                breaker.record_success()
+                return response
+
+            breaker.record_failure()
+            _count(upstream, "failures")
+            wait = policy.wait_for_response(attempt, response)
+            if limiter is not None and response.status_code == 429:
+                # Hold every session back, not just this caller.
+                limiter.defer(wait)
+            if not _should_retry(policy, attempt, wait, give_up_at):
+                break
+
+        _count(upstream, "retries")
+        with span("retry.wait", upstream=upstream, attempt=attempt + 1, wait=wait):
+            await asyncio.sleep(wait)
+
+    return response
+
+
+def _should_retry(policy, attempt, wait, give_up_at):
+    """Return whether another attempt after ``wait`` seconds fits the policy budget."""
+    return attempt + 1 < policy.max_attempts and time.monotonic() + wait < give_up_at
+
+
+def _rate_limit_timeout(policy, limiter, give_up_at):
+    """Return how long an attempt may queue for a rate-limit slot."""
+    timeout = (
+        limiter.max_wait if policy.rate_limit_wait is None else policy.rate_limit_wait
+    )
+    return max(0.0, min(timeout, give_up_at - time.monotonic()))
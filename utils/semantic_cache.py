@@ -0,0 +1,230 @@
+import re
+import threading
+import uuid
+import zlib
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+
+from utils.settings import get_settings
+from utils.tracing import increment
+
+_cache = None
+_cache_lock = threading.Lock()
+
+_FILLER_WORDS = frozenset(
+    """
+    a an the please can could would you me i my some any to for of
+    recommend suggest show give find get want need looking what are is good
+    """.split()
+)
+_SYNONYMS = {
+    "similar": "like",
+    "film": "movie",
+    "films": "movies",
+    "flicks": "movies",
+    "places": "restaurants",
+    "restaurant": "restaurants",
+}
+
+
+def _words(text):
+    return re.sub(r"[^\w]+", " ", text.casefold()).split()
+
+
+def normalize_intent(text):
+    """Casefold, drop punctuation and filler words, and collapse whitespace."""
+    words = (_SYNONYMS.get(w, w) for w in _words(text))
+    return " ".join(w for w in words if w not in _FILLER_WORDS)
+
+
+def embed(text, dim=512):
+    """
+    Embed ``text`` as an L2-normalized vector of hashed words and character trigrams.
+
+    Cheap, deterministic and CPU-only: good at matching reorderings, light
+    rephrasings and typos of the same request, with no model download.
+    """
+    intent = normalize_intent(text)
+    padded = f" {intent} "
+    grams = [padded[i : i + 3] for i in range(len(padded) - 2)] + intent.split()
+    vector = np.zeros(dim, dtype=np.float32)
+    if grams:
+        buckets = [zlib.crc32(g.encode()) % dim for g in grams]
+        vector += np.sqrt(np.bincount(buckets, minlength=dim)).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+    return vector
+
+
+class SemanticCache:
+    """
+    Bounded nearest-neighbour cache from user messages to model responses.
+
+    Embeddings live in one preallocated matrix, so a lookup is a single
+    matrix-vector product. Once ``maxsize`` entries are stored, the least
+    recently used one is overwritten. A lookup is a hit when the best cosine
+    similarity reaches ``threshold``.
+    """
+
+    def __init__(self, maxsize=2000, threshold=0.85, dim=512):
+        if maxsize < 1:
+            raise ValueError("Semantic cache maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.dim = dim
+        self._vectors = np.zeros((maxsize, dim), dtype=np.float32)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._values = [None] * maxsize
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def get(self, text, accept=None):
+        """
+        Return the value stored for the text most similar to ``text``, or `None`.
+
+        ``accept(value)``, if given, can reject the nearest match (e.g. when it
+        names an entity missing from ``text``).
+        """
+        query = embed(text, self.dim)
+        with self._lock:
+            if self._size == 0:
+                return None
+            scores = self._vectors[: self._size] @ query
+            best = int(np.argmax(scores))
+            value = self._values[best]
+            if scores[best] < self.threshold or (
+                accept is not None and not accept(value)
+            ):
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            return value
+
+    def set(self, text, value):
+        """Store ``value`` for ``text``, evicting the least recently used entry if full."""
+        vector = embed(text, self.dim)
+        with self._lock:
+            if self._size < self.maxsize:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                increment("semantic_cache_evictions")
+            self._clock += 1
+            self._vectors[slot] = vector
+            self._values[slot] = value
+            self._last_used[slot] = self._clock
+
+    def clear(self):
+        with self._lock:
+            self._values = [None] * self.maxsize
+            self._last_used[:] = 0
+            self._size = 0
+
+
+def get_semantic_cache():
+    """
+    Get the process-wide semantic response cache, or `None` when disabled.
+
+    Enabled with ``SEMANTIC_CACHE=1``; tuned by ``SEMANTIC_CACHE_THRESHOLD``
+    (cosine similarity, default 0.85) and ``SEMANTIC_CACHE_MAXSIZE`` (default 2000).
+    """
+    global _cache
+    settings = get_settings()
+    if not settings.semantic_cache:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    maxsize=settings.semantic_cache_maxsize,
+                    threshold=settings.semantic_cache_threshold,
+                )
+    return _cache
+
+
+def cacheable_turn(messages):
+    """
+    Return the user text a response to ``messages`` can be cached under, or `None`.
+
+    Only the model's first step of a turn (the last message is the user's) is
+    cacheable: later steps depend on tool results.
+    """
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    content = messages[-1].content
+    return content if isinstance(content, str) and content.strip() else None
+
+
+def is_first_turn(messages):
+    return sum(isinstance(m, HumanMessage) for m in messages) == 1
+
+
+def is_grounded(response, text):
+    """
+    Return whether every string argument of the response's tool calls appears in ``text``.
+
+    A grounded tool call is fully determined by the user's message, so it can
+    be replayed for a similar message that names the same entities
+    ("movies like Inception" -> ``movie_title="Inception"``).
+    """
+    haystack = f" {' '.join(_words(text))} "
+    for call in response["tool_calls"]:
+        for value in call["args"].values():
+            if not isinstance(value, str):
+                continue
+            needle = " ".join(_words(value))
+            if not needle or f" {needle} " not in haystack:
+                return False
+    return True
+
+
+def lookup_response(cache, messages):
+    """Return a cached `AIMessage` answering ``messages``, or `None` on a miss."""
+    text = cacheable_turn(messages)
+    if text is None:
+        return None
+    first_turn = is_first_turn(messages)
+
+    def accept(entry):
+        if entry["tool_calls"]:
+            return is_grounded(entry, text)
+        # Plain answers may lean on earlier turns; only reuse them as openers.
+        return first_turn and entry["first_turn"]
+
+    entry = cache.get(text, accept=accept)
+    if entry is None:
+        increment("semantic_cache_misses")
+        return None
+    increment("semantic_cache_hits")
+    # Tool call IDs pair calls with results, so every replay needs fresh ones.
+    return AIMessage(
+        content=entry["content"],
+        tool_calls=[
+            {**call, "id": f"call_{uuid.uuid4().hex}"} for call in entry["tool_calls"]
+        ],
+    )
+
+
+def store_response(cache, messages, response):
+    """Cache ``response`` to ``messages`` if it can be safely replayed later."""
+    text = cacheable_turn(messages)
+    if text is None or getattr(response, "invalid_tool_calls", None):
+        return
+    entry = {
+        "content": response.content,
+        "tool_calls": [
+            {"name": call["name"], "args": call["args"]} for call in response.tool_calls
+        ],
+        "first_turn": is_first_turn(messages),
+    }
+    if entry["tool_calls"] and not is_grounded(entry, text):
+        return
+    if not entry["tool_calls"] and not entry["first_turn"]:
+        return
+    cache.set(text, entry)
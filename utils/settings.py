@@ -0,0 +1,148 @@
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+
+from dotenv import load_dotenv
+
+DEFAULT_YELP_BASE_URL = "https://api.yelp.com/v3/businesses/search"
+DEFAULT_TMDB_INDEX_PATH = ".cache/tmdb_movie_index.json"
+
+# Upstreams that can be rate limited through ``<NAME>_RATE_LIMIT``.
+RATE_LIMITED_UPSTREAMS = ("yelp", "tmdb", "gemini")
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Every environment-driven option, parsed once per process.
+
+    See the "Optional tuning" table in the README for what each option does.
+    """
+
+    yelp_api_key: str | None = None
+    yelp_base_url: str = DEFAULT_YELP_BASE_URL
+    yelp_page_size: int = 50
+    yelp_max_results: int = 240
+    tmdb_api_key: str | None = None
+    tmdb_base_url: str | None = None
+    google_api_key: str | None = None
+
+    tmdb_cache_maxsize: int = 512
+    tmdb_cache_ttl: float = 3600.0
+    tmdb_cache_db: str | None = None
+    tmdb_index_path: str | None = DEFAULT_TMDB_INDEX_PATH
+    tmdb_index_max_entries: int = 50000
+    tmdb_prefetch_top_k: int = 0
+    tmdb_prefetch_workers: int = 2
+
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 20
+    http_connect_timeout: float = 3.05
+    http_read_timeout: float = 10.0
+    http_retry_max_attempts: int = 4
+    http_retry_base_delay: float = 0.5
+    http_retry_max_delay: float = 8.0
+    http_retry_deadline: float = 20.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    # Upstream name -> (calls per second, burst); missing means unlimited.
+    rate_limits: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    rate_limit_max_wait: float = 10.0
+    rate_limit_db: str | None = None
+
+    tool_result_max_items: int = 10
+    results_page_size: int = 6
+    chat_history_token_budget: int = 6000
+    intent_router: bool = True
+    semantic_cache: bool = False
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_maxsize: int = 2000
+    conversation_db: str | None = None
+    conversation_max_sessions: int = 1000
+    api_max_threads: int = 1000
+    api_thread_ttl: float = 86400.0
+
+    trace_json_log: str | None = None
+    trace_prometheus_port: int | None = None
+
+    @classmethod
+    def from_env(cls):
+        """Build settings from the process environment (after `.env` is loaded)."""
+        rate_limits = {}
+        for name in RATE_LIMITED_UPSTREAMS:
+            rate = float(os.getenv(f"{name.upper()}_RATE_LIMIT", "0") or 0)
+            if rate > 0:
+                burst = int(
+                    os.getenv(f"{name.upper()}_RATE_BURST", str(max(1, int(rate))))
+                )
+                rate_limits[name] = (rate, burst)
+
+        prometheus_port = os.getenv("TRACE_PROMETHEUS_PORT")
+        return cls(
+            yelp_api_key=os.getenv("YELP_API_KEY"),
+            yelp_base_url=os.getenv("YELP_BASE_URL") or DEFAULT_YELP_BASE_URL,
+            # Yelp returns at most 50 businesses per request and 240 per search.
+            yelp_page_size=min(50, max(1, int(os.getenv("YELP_PAGE_SIZE", "50")))),
+            yelp_max_results=max(1, int(os.getenv("YELP_MAX_RESULTS", "240"))),
+            tmdb_api_key=os.getenv("THE_MOVIE_DB_API_KEY"),
+            tmdb_base_url=os.getenv("BASE_URL"),
+            google_api_key=os.getenv("GOOGLE_API_KEY"),
+            tmdb_cache_maxsize=int(os.getenv("TMDB_CACHE_MAXSIZE", "512")),
+            tmdb_cache_ttl=float(os.getenv("TMDB_CACHE_TTL", "3600")),
+            tmdb_cache_db=os.getenv("TMDB_CACHE_DB") or None,
+            tmdb_index_path=os.getenv("TMDB_INDEX_PATH", DEFAULT_TMDB_INDEX_PATH)
+            or None,
+            tmdb_index_max_entries=int(os.getenv("TMDB_INDEX_MAX_ENTRIES", "50000")),
+            tmdb_prefetch_top_k=int(os.getenv("TMDB_PREFETCH_TOP_K", "0")),
+            tmdb_prefetch_workers=int(os.getenv("TMDB_PREFETCH_WORKERS", "2")),
+            http_pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", "10")),
+            http_pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+            http_connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+            http_read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+            http_retry_max_attempts=int(os.getenv("HTTP_RETRY_MAX_ATTEMPTS", "4")),
+            http_retry_base_delay=float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.5")),
+            http_retry_max_delay=float(os.getenv("HTTP_RETRY_MAX_DELAY", "8")),
+            http_retry_deadline=float(os.getenv("HTTP_RETRY_DEADLINE", "20")),
+            circuit_failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            circuit_reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+            rate_limits=MappingProxyType(rate_limits),
+            rate_limit_max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", "10")),
+            rate_limit_db=os.getenv("RATE_LIMIT_DB") or None,
+            tool_result_max_items=int(os.getenv("TOOL_RESULT_MAX_ITEMS", "10")),
+            results_page_size=max(1, int(os.getenv("RESULTS_PAGE_SIZE", "6"))),
+            chat_history_token_budget=int(
+                os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000")
+            ),
+            intent_router=_env_flag("INTENT_ROUTER", "1"),
+            semantic_cache=_env_flag("SEMANTIC_CACHE", "0"),
+            semantic_cache_threshold=float(
+                os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85")
+            ),
+            semantic_cache_maxsize=int(os.getenv("SEMANTIC_CACHE_MAXSIZE", "2000")),
+            conversation_db=os.getenv("CONVERSATION_DB") or None,
+            conversation_max_sessions=int(
+                os.getenv("CONVERSATION_MAX_SESSIONS", "1000")
+            ),
+            api_max_threads=int(os.getenv("API_MAX_THREADS", "1000")),
+            api_thread_ttl=float(os.getenv("API_THREAD_TTL", "86400")),
+            trace_json_log=os.getenv("TRACE_JSON_LOG") or None,
+            trace_prometheus_port=int(prometheus_port) if prometheus_port else None,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """
+    Load `.env` and parse the environment into `Settings`, once per process.
+
+    Call ``get_settings.cache_clear()`` to pick up environment changes (e.g.
+    in benchmarks that point the tools at local fake servers).
+    """
+    load_dotenv()  # Load variables from .env
+    return Settings.from_env()
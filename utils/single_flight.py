@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+from utils.tracing import increment
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent identical calls.
+
+    While a call for ``key`` is in flight, other callers with the same key wait
+    for it and share its result (or exception) instead of issuing their own
+    upstream request. Nothing is cached once the call completes; pair with
+    `TTLCache` for that.
+
+    Threads share calls through `do`; coroutines on the same event loop share
+    calls through `ado`. Shared results must be treated as read-only.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return ``fn()``, or the result of an identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            increment("single_flight_shared", group=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key, coro_fn):
+        """Async counterpart of `do`; ``coro_fn()`` must return an awaitable."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        future = self._async_calls.get(loop_key)
+        if future is not None:
+            increment("single_flight_shared", group=self.name)
+            # Shield so one cancelled waiter doesn't cancel the shared call.
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(coro_fn())
+        self._async_calls[loop_key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._async_calls.pop(loop_key, None)
+            else:
+                future.add_done_callback(
+                    lambda _: self._async_calls.pop(loop_key, None)
+                )
@@ -1,11 +1,34 @@
-import os
-import time
-import random
-import requests
-from dotenv import load_dotenv
-from langchain.tools import tool 
+import threading
+
+from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
+from utils.cache import TTLCache
+from utils.http_client import ahttp_get, http_get
+from utils.movie_index import get_movie_index, split_year
+from utils.prefetch import Prefetcher
+from utils.projections import project_movie_recommendations
+from utils.retry import (
+    CircuitOpenError,
+    RetryPolicy,
+    arequest_with_retry,
+    get_circuit_breaker,
+    request_with_retry,
+)
+from utils.settings import get_settings
+from utils.single_flight import SingleFlight
+from utils.tracing import increment, span
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+# Concurrent identical TMDB requests from different sessions share one call.
+_search_flight = SingleFlight("tmdb_search")
+_recommendations_flight = SingleFlight("tmdb_recommendations")
+
 class MovieRecommendationToolInput(BaseModel):
     movie_title: str = Field(
         ...,
@@ -16,45 +39,132 @@ def get_the_movie_db_cache_data(the_movie_db_api_key_arg = None, base_url_arg =
     """
     Get TMDB API cache data.
     """
-    the_movie_db_api_key = the_movie_db_api_key_arg or os.getenv("THE_MOVIE_DB_API_KEY")
+    settings = get_settings()
+    the_movie_db_api_key = the_movie_db_api_key_arg or settings.tmdb_api_key
     if not the_movie_db_api_key:
         raise ValueError("TMDB API key is not set in environment variables.")
     
-    base_url = base_url_arg or os.getenv("BASE_URL")
+    base_url = base_url_arg or settings.tmdb_base_url
     if not base_url:
         raise ValueError("TMDB API base URL is not set in environment variables.")
     
     return base_url, the_movie_db_api_key
-    
 
-def make_request_with_retry(url, params, headers, max_retries=105, min_wait=10, max_wait=20):
-    response = None
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, params=params, headers=headers)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 429:  # Rate limit exceeded
-                retry_after = response.headers.get("Retry-After")
-                if retry_after:
-                    wait_time = int(retry_after)
-                else:
-                    wait_time = random.randint(min_wait, max_wait)
-                print(f"Rate limit hit. Waiting {wait_time} seconds before retrying...")
-                time.sleep(wait_time)
-            else:
-                print(f"Error: Status {response.status_code} on {url}: {response.text}")
-                break  # Break out for other errors
-        except Exception as e:
-            wait_time = random.randint(min_wait, max_wait)
-            print(f"Rate limit hit. Waiting {wait_time} seconds before retrying...")
-            time.sleep(wait_time)
-        
-    return None
-
-
-@tool(args_schema=MovieRecommendationToolInput)
-def get_movie_recommendations(movie_title: str) -> dict:
+
+def get_the_movie_db_response_cache():
+    """
+    Get the process-wide TMDB response cache, creating it on first use.
+
+    Configured through ``TMDB_CACHE_MAXSIZE`` (entries, default 512),
+    ``TMDB_CACHE_TTL`` (seconds, default 3600) and ``TMDB_CACHE_DB`` (optional
+    SQLite path shared by every worker process on the host).
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                settings = get_settings()
+                _response_cache = TTLCache(
+                    maxsize=settings.tmdb_cache_maxsize,
+                    ttl=settings.tmdb_cache_ttl,
+                    db_path=settings.tmdb_cache_db,
+                    namespace="tmdb",
+                )
+    return _response_cache
+
+
+def get_recommendation_prefetcher():
+    """
+    Get the process-wide prefetcher that warms `/movie/{id}/recommendations`.
+
+    Prefetches make a single attempt (no retry backoff, no queueing for a
+    rate-limit slot) on ``TMDB_PREFETCH_WORKERS`` threads (default 2) and back
+    off entirely while the `tmdb` circuit breaker reports failures.
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                cache = get_the_movie_db_response_cache()
+                policy = RetryPolicy.from_env(max_attempts=1, rate_limit_wait=0)
+                _prefetcher = Prefetcher(
+                    fetch=lambda movie_id: fetch_recommendations(movie_id, policy=policy),
+                    is_cached=lambda movie_id: cache.contains(f"recommendations:{movie_id}"),
+                    breaker=get_circuit_breaker("tmdb"),
+                    max_workers=get_settings().tmdb_prefetch_workers,
+                    name="tmdb_recommendations",
+                )
+    return _prefetcher
+
+
+def prefetch_chained_recommendations(recommendations):
+    """
+    Prepare for the prompt's "recommendation chaining" follow-up turn.
+
+    Returned titles are already in the movie index (see `fetch_recommendations`),
+    so a follow-up on any of them skips `/search/movie`. When
+    ``TMDB_PREFETCH_TOP_K`` is set (default 0, disabled), recommendations for
+    the top-K returned movies are also fetched in the background.
+    """
+    top_k = get_settings().tmdb_prefetch_top_k
+    if top_k > 0:
+        get_recommendation_prefetcher().schedule(
+            [m["id"] for m in recommendations[:top_k] if m.get("id") is not None]
+        )
+
+
+def make_request_with_retry(url, params, headers, policy=None):
+    """
+    GET a TMDB endpoint through the shared retry policy and `tmdb` circuit breaker.
+
+    Transient failures (timeouts, connection errors, 429 and 5xx) are retried
+    with jittered exponential backoff inside the policy's deadline. Returns the
+    decoded JSON body, or `None` on any non-200 outcome or when TMDB's circuit
+    is open.
+    """
+    try:
+        response = request_with_retry(
+            lambda: http_get(url, params=params, headers=headers),
+            upstream="tmdb",
+            policy=policy,
+        )
+    except CircuitOpenError as e:
+        print(f"Error: {e}")
+        return None
+    except Exception as e:
+        print(f"Error: Request to {url} failed: {e}")
+        return None
+
+    return _decode_response(url, response)
+
+
+async def amake_request_with_retry(url, params, headers, policy=None):
+    """Async counterpart of `make_request_with_retry` using the pooled `httpx` client."""
+    try:
+        response = await arequest_with_retry(
+            lambda: ahttp_get(url, params=params, headers=headers),
+            upstream="tmdb",
+            policy=policy,
+        )
+    except CircuitOpenError as e:
+        print(f"Error: {e}")
+        return None
+    except Exception as e:
+        print(f"Error: Request to {url} failed: {e}")
+        return None
+
+    return _decode_response(url, response)
+
+
+def _decode_response(url, response):
+    if response.status_code != 200:
+        print(f"Error: Status {response.status_code} on {url}: {response.text}")
+        return None
+    return response.json()
+
+
+@tool(args_schema=MovieRecommendationToolInput, response_format="content_and_artifact")
+def get_movie_recommendations(movie_title: str) -> tuple[str, dict]:
     """
     Search for a movie on The Movie Database (TMDB) by title, retrieve its unique movie ID, 
     then fetch and return a list of recommended movies with basic details.
@@ -71,79 +181,244 @@ def get_movie_recommendations(movie_title: str) -> dict:
             Partial titles and case-insensitive matches are supported.
 
     Returns:
-        dict: 
-            A dictionary containing:
-            - **found_title** (str | None): 
+        tuple[str, dict]:
+            The model receives compact JSON containing:
+            - **found_title** (str | None):
                 The exact movie title found on TMDB, or `None` if no match is found.
             - **recommendations** (list[dict]):
-                A list of recommended movies, each containing:
-                - `title` (str): Movie title.
-                - `rating` (float | "N/A"): Average TMDB user rating (0–10 scale).
-                - `language` (str | "N/A"): ISO 639-1 language code (e.g., "en", "fr").
-                - `poster-img` (str | "N/A"): Movie poster image if available.
+                Up to `TOOL_RESULT_MAX_ITEMS` recommended movies, each with
+                `title`, `rating` (0–10 scale), `language` (ISO 639-1) and `year`.
+            - **total** (int): Number of recommendations TMDB returned.
+            The full result (including poster images) is attached to the
+            `ToolMessage` as its artifact for the UI.
 
     Example:
-        >>> get_movie_recommendations("Inception")
-        {
-            "found_title": "Inception",
-            "recommendations": [
-                {
-                    "title": "The Prestige",
-                    "rating": 8.2,
-                    "language": "en",
-                    "poster-img": "https://image.tmdb.org/t/p/original/abc.jpg"
-                },
-                {
-                    "title": "Interstellar",
-                    "rating": 8.4,
-                    "language": "en",
-                    "poster-img": https://image.tmdb.org/t/p/original/abc123.jpg,
-                }
-            ]
-        }
+        >>> get_movie_recommendations.invoke({"movie_title": "Inception"})
+        '{"found_title":"Inception","recommendations":[{"title":"The Prestige","rating":8.2,"language":"en","year":"2006"}],"total":1}'
 
     Notes:
         - This function requires a valid TMDB API key set in environment variables 
           or retrieved from `get_the_movie_db_cache_data()`.
-        - Only the first search result is used for recommendations.
+        - Titles are resolved through a local title -> ID index (see
+          `utils/movie_index.py`) fed by search results and every recommendation
+          list, so repeat and chained titles skip `/search/movie`. Same-titled
+          movies are disambiguated by a year in the title, then by popularity.
+        - Recommendation responses are cached in-process (see
+          `get_the_movie_db_response_cache()`), so repeat lookups skip TMDB.
         - For full director and cast information, see TMDB's `/credits` endpoint.
     """
-    load_dotenv()
+    with span("tool", tool="get_movie_recommendations") as current:
+        result = find_movie_recommendations(movie_title)
+        current.set("results", len(result["recommendations"]))
+    return project_movie_recommendations(result), result
+
+
+async def aget_movie_recommendations(movie_title: str) -> tuple[str, dict]:
+    """Async implementation of `get_movie_recommendations`."""
+    with span("tool", tool="get_movie_recommendations") as current:
+        result = await afind_movie_recommendations(movie_title)
+        current.set("results", len(result["recommendations"]))
+    return project_movie_recommendations(result), result
+
+
+def find_movie_recommendations(movie_title):
+    """
+    Resolve ``movie_title`` and return the full recommendation result.
+
+    Returns:
+        dict: ``{"found_title": str | None, "recommendations": list[dict]}`` where
+        each recommendation has `id`, `title`, `rating`, `language`,
+        `release_date` and `poster-img`.
+    """
+    # Step 1: Find movie ID
+    match = search_movie(movie_title)
+    if match is None:
+        return {"found_title": None, "recommendations": []}
+
+    # Step 2: Get recommendations
+    recommendations = fetch_recommendations(match["id"])
+    if recommendations is None:
+        return {"found_title": match["title"], "recommendations": []}
+
+    prefetch_chained_recommendations(recommendations)
+    return {"found_title": match["title"], "recommendations": recommendations}
+
 
+async def afind_movie_recommendations(movie_title):
+    """Async counterpart of `find_movie_recommendations`."""
+    match = await asearch_movie(movie_title)
+    if match is None:
+        return {"found_title": None, "recommendations": []}
+
+    recommendations = await afetch_recommendations(match["id"])
+    if recommendations is None:
+        return {"found_title": match["title"], "recommendations": []}
+
+    prefetch_chained_recommendations(recommendations)
+    return {"found_title": match["title"], "recommendations": recommendations}
+
+
+# Native coroutine used by `ainvoke`/`astream`, so parallel tool calls in one
+# AIMessage run concurrently on the event loop instead of in worker threads.
+get_movie_recommendations.coroutine = aget_movie_recommendations
+
+
+def search_movie(movie_title):
+    """
+    Resolve a movie title to its TMDB ``{"id", "title"}``.
+
+    Known titles are answered from the local movie index without a network
+    call; otherwise `/search/movie` is queried and all of its results are
+    indexed. Returns `None` when TMDB has no match or the request failed.
+    """
+    index = get_movie_index()
+    match = index.resolve(movie_title)
+    if match is not None:
+        increment("movie_index_hits")
+        return match
+
+    increment("movie_index_misses")
+    request = _search_request(movie_title)
+    search_resp = _search_flight.do(
+        _flight_key(request), lambda: make_request_with_retry(*request)
+    )
+    return _resolve_search_response(index, movie_title, search_resp)
+
+
+async def asearch_movie(movie_title):
+    """Async counterpart of `search_movie`."""
+    index = get_movie_index()
+    match = index.resolve(movie_title)
+    if match is not None:
+        increment("movie_index_hits")
+        return match
+
+    increment("movie_index_misses")
+    request = _search_request(movie_title)
+    search_resp = await _search_flight.ado(
+        _flight_key(request), lambda: amake_request_with_retry(*request)
+    )
+    return _resolve_search_response(index, movie_title, search_resp)
+
+
+def fetch_recommendations(movie_id, policy=None):
+    """
+    Fetch TMDB recommendations for ``movie_id`` using `/movie/{movie_id}/recommendations`.
+
+    Results are cached on the movie ID. Returns `None` when the request failed.
+    ``policy`` overrides the default `RetryPolicy`.
+    """
+    cache = get_the_movie_db_response_cache()
+    cache_key = f"recommendations:{movie_id}"
+    recommendations = cache.get(cache_key)
+    if recommendations is not None:
+        return recommendations
+
+    request = _recommendations_request(movie_id)
+    recommendations = _parse_recommendations_response(
+        _shared_recommendations_request(request, policy)
+    )
+    if recommendations is not None:
+        cache.set(cache_key, recommendations)
+        get_movie_index().add_many(recommendations)
+    return recommendations
+
+
+async def afetch_recommendations(movie_id):
+    """Async counterpart of `fetch_recommendations`."""
+    cache = get_the_movie_db_response_cache()
+    cache_key = f"recommendations:{movie_id}"
+    recommendations = cache.get(cache_key)
+    if recommendations is not None:
+        return recommendations
+
+    request = _recommendations_request(movie_id)
+    recommendations = _parse_recommendations_response(
+        await _recommendations_flight.ado(
+            _flight_key(request), lambda: amake_request_with_retry(*request)
+        )
+    )
+    if recommendations is not None:
+        cache.set(cache_key, recommendations)
+        get_movie_index().add_many(recommendations)
+    return recommendations
+
+
+def _shared_recommendations_request(request, policy):
+    """
+    Make a recommendations request, sharing any identical one in flight.
+
+    A custom ``policy`` marks the call as best effort (the prefetcher's single
+    attempt). A default-policy caller that joined such a call and got nothing
+    back makes its own request with the full retry policy, instead of failing
+    the user's turn on a prefetch's single attempt.
+    """
+    key = _flight_key(request)
+    body, best_effort = _recommendations_flight.do(
+        key, lambda: (make_request_with_retry(*request, policy=policy), policy is not None)
+    )
+    if body is None and best_effort and policy is None:
+        body, _ = _recommendations_flight.do(
+            key, lambda: (make_request_with_retry(*request), False)
+        )
+    return body
+
+
+def _flight_key(request):
+    url, params, _ = request
+    return url, tuple(sorted((k, str(v).casefold()) for k, v in params.items()))
+
+
+def _search_request(movie_title):
     tmdb_base_url, the_movie_db_api_key = get_the_movie_db_cache_data()
     search_url = f"{tmdb_base_url}/search/movie"
-    search_params = {"query": movie_title}
+    title, year = split_year(movie_title)
+    search_params = {"query": title.strip()}
+    if year:
+        search_params["primary_release_year"] = year
     headers = {"Authorization": f"Bearer {the_movie_db_api_key}"}
+    return search_url, search_params, headers
 
-    # Step 1: Find movie ID
-    search_resp = make_request_with_retry(search_url, search_params, headers)
+
+def _resolve_search_response(index, movie_title, search_resp):
     if not search_resp or not search_resp.get("results"):
-        return {"found_title": None, "recommendations": []}
+        return None
 
-    movie_id = search_resp["results"][0]["id"]
-    found_title = search_resp["results"][0]["title"]
+    results = search_resp["results"]
+    index.add_many(results)
+    # Prefer the index's year/popularity disambiguation over TMDB's first hit.
+    match = index.resolve(movie_title) or {
+        "id": results[0]["id"],
+        "title": results[0]["title"],
+    }
+    index.add_alias(movie_title, match)
+    return match
 
-    # Step 2: Get recommendations
+
+def _recommendations_request(movie_id):
+    tmdb_base_url, the_movie_db_api_key = get_the_movie_db_cache_data()
     rec_url = f"{tmdb_base_url}/movie/{movie_id}/recommendations"
     rec_params = {"language": "en-US", "page": 1}
-    print(f"Fetching recommendations for movie ID: {movie_id} ({found_title})")
-    print(f"Requesting URL: {rec_url} with params: {rec_params}")
-    rec_resp = make_request_with_retry(rec_url, rec_params, headers)
+    headers = {"Authorization": f"Bearer {the_movie_db_api_key}"}
+    return rec_url, rec_params, headers
 
+
+def _parse_recommendations_response(rec_resp):
     if not rec_resp:
-        return {"found_title": found_title, "recommendations": []}
+        return None
 
-    print(f"Recommendations response for movie '{found_title}': {rec_resp}")
     recommendations = []
     for movie in rec_resp.get("results", []):
         recommendations.append({
+            "id": movie.get("id"),
             "title": movie["title"],
             "rating": movie.get("vote_average", "N/A"),
             "language": movie.get("original_language", "N/A"),
+            "release_date": movie.get("release_date"),
+            "popularity": movie.get("popularity"),
             "poster-img": r'https://image.tmdb.org/t/p/original/' + movie.get("poster_path", "N/A")
         })
-
-    return {"found_title": found_title, "recommendations": recommendations}
+    return recommendations
 
 if __name__ == "__main__":
-    print(get_movie_recommendations("Inception"))
\ No newline at end of file
+    print(get_movie_recommendations.invoke({"movie_title": "Inception"}))
\ No newline at end of file
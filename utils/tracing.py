@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.settings import get_settings
+
+_current_span = ContextVar("current_span", default=None)
+
+_sinks = []
+_sinks_lock = threading.Lock()
+_configured = False
+
+
+class Span:
+    """A timed unit of work (a graph node run, tool call, HTTP request, retry wait...)."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_time",
+        "duration",
+        "error",
+    )
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, key, value):
+        """Attach an attribute (e.g. a status code or token count) to the span."""
+        self.attributes[key] = value
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class JsonLogSink:
+    """Append every finished span and counter increment as a JSON line to ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def on_span(self, span):
+        self._write({"type": "span", **span.to_dict()})
+
+    def on_counter(self, name, value, labels):
+        self._write(
+            {
+                "type": "counter",
+                "name": name,
+                "value": value,
+                "labels": labels,
+                "time": time.time(),
+            }
+        )
+
+
+class PrometheusSink:
+    """
+    Aggregate spans into duration histograms and counters, rendered in the
+    Prometheus text exposition format by `render()` or served by `serve()`.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, prefix="chatbot"):
+        self.prefix = prefix
+        self._histograms = {}  # span name -> [bucket counts..., count, sum]
+        self._counters = {}  # (name, labels) -> value
+        self._lock = threading.Lock()
+        self._server = None
+
+    def on_span(self, span):
+        with self._lock:
+            hist = self._histograms.setdefault(
+                span.name, [0] * len(self.BUCKETS) + [0, 0.0]
+            )
+            for i, bound in enumerate(self.BUCKETS):
+                if span.duration <= bound:
+                    hist[i] += 1
+            hist[-2] += 1
+            hist[-1] += span.duration
+        if span.error:
+            self.on_counter("span_errors", 1, {"span": span.name})
+
+    def on_counter(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self):
+        """Return all metrics in the Prometheus text format."""
+        metric = f"{self.prefix}_span_duration_seconds"
+        lines = [f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, hist in sorted(self._histograms.items()):
+                for bound, count in zip(self.BUCKETS, hist):
+                    lines.append(
+                        f'{metric}_bucket{{span="{name}",le="{bound}"}} {count}'
+                    )
+                lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {hist[-2]}')
+                lines.append(f'{metric}_count{{span="{name}"}} {hist[-2]}')
+                lines.append(f'{metric}_sum{{span="{name}"}} {hist[-1]}')
+
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                counter = f"{self.prefix}_{name}_total"
+                if counter not in typed:
+                    lines.append(f"# TYPE {counter} counter")
+                    typed.add(counter)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{counter}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="0.0.0.0"):
+        """Expose `render()` at ``http://host:port/metrics`` from a daemon thread."""
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+def add_sink(sink):
+    """Register a sink; it receives ``on_span(span)`` and ``on_counter(name, value, labels)``."""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def get_sinks():
+    with _sinks_lock:
+        return list(_sinks)
+
+
+def configure_tracing_from_env():
+    """
+    Register sinks once per process from environment variables.
+
+    - ``TRACE_JSON_LOG``: path of a JSON-lines span log.
+    - ``TRACE_PROMETHEUS_PORT``: port serving Prometheus metrics at ``/metrics``.
+    """
+    global _configured
+    with _sinks_lock:
+        if _configured:
+            return
+        _configured = True
+
+    settings = get_settings()
+    if settings.trace_json_log:
+        add_sink(JsonLogSink(settings.trace_json_log))
+
+    if settings.trace_prometheus_port:
+        sink = PrometheusSink()
+        sink.serve(settings.trace_prometheus_port)
+        add_sink(sink)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the enclosed block as a span nested under the current one.
+
+    Yields the `Span`, so callers can attach attributes discovered while the
+    block runs. Exceptions are recorded on the span and re-raised.
+    """
+    current = Span(name, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A generator holding the span was closed from another context,
+            # which has its own value for the variable; nothing to restore.
+            pass
+        for sink in get_sinks():
+            sink.on_span(current)
+
+
+def increment(name, value=1, **labels):
+    """Increment a named counter (e.g. cache hits) with optional labels."""
+    for sink in get_sinks():
+        sink.on_counter(name, value, labels)
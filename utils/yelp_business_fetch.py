@@ -1,16 +1,36 @@
-import os
+import asyncio
+import contextvars
+import heapq
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-from dotenv import load_dotenv
-from langchain.tools import tool
+from langchain_core.tools import tool
+from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 
+from utils.http_client import ahttp_get, http_get
+from utils.projections import project_restaurants
+from utils.retry import arequest_with_retry, request_with_retry
+from utils.settings import get_settings
+from utils.single_flight import SingleFlight
+from utils.tracing import span
+
+# Concurrent identical page requests from different sessions share one Yelp call.
+_search_flight = SingleFlight("yelp_search")
+
+# Custom stream event carrying the ranked results gathered so far.
+PROGRESS_EVENT = "restaurant_search"
+
+# Cuisines of one multi-cuisine search fetched at the same time.
+_MAX_PARALLEL_SEARCHES = 4
+
 
 def get_yelp_cache_data(api_key_arg=None, base_url_arg=None, timeout_arg=None):
     """Get cached Yelp API configuration data."""
-    load_dotenv()  # Load variables from .env
+    settings = get_settings()
 
-    api_key = api_key_arg or os.getenv("YELP_API_KEY")
+    api_key = api_key_arg or settings.yelp_api_key
     if not api_key:
         raise ValueError("Yelp API key is not set in environment variables.")
 
@@ -21,11 +41,12 @@ def get_yelp_cache_data(api_key_arg=None, base_url_arg=None, timeout_arg=None):
         "very expensive": "4",
     }
 
-    base_url = base_url_arg or "https://api.yelp.com/v3/businesses/search"
+    base_url = base_url_arg or settings.yelp_base_url
     if not base_url:
         raise ValueError("Yelp API base URL is not set in environment variables.")
 
-    timeout = timeout_arg or 10
+    # `None` falls back to the shared HTTP client's connect/read timeouts.
+    timeout = timeout_arg
     return api_key, base_url, price_tiers, timeout
 
 
@@ -34,7 +55,10 @@ class RestaurantSearchToolInput(BaseModel):
 
     cuisine: str = Field(
         ...,
-        description="Search cuisine for the restaurant, e.g., 'japanese', 'indian', 'italian', 'mexican'.",
+        description=(
+            "Search cuisine for the restaurant, e.g., 'japanese', 'indian', 'italian', 'mexican'. "
+            "Compare several cuisines in one call by separating them with commas, e.g., 'ramen, sushi'."
+        ),
     )
     location: str = Field(
         ...,
@@ -46,11 +70,60 @@ class RestaurantSearchToolInput(BaseModel):
     )
     limit: int = Field(
         default=5,  # Changed from 3 to match function default
-        description="Number of results to return (1-50).",
+        description="Number of results to return per cuisine (1-240); large requests are fetched page by page.",
     )
 
 
-@tool(args_schema=RestaurantSearchToolInput)
+class RankedBusinesses:
+    """
+    Incrementally merged and ranked Yelp results.
+
+    Pages from one or more searches are added as they arrive. Businesses seen
+    before (by ID) are dropped, and only the best ``maxsize`` are kept, ranked
+    by rating, then review count, then arrival order, so memory stays bounded
+    however many pages are fetched.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = max(1, maxsize)
+        self._seen = set()
+        self._heap = []  # (rating, review_count, -arrival, business); worst first
+        self._arrivals = 0
+
+    def add(self, businesses):
+        """Merge one page; returns how many new businesses it contributed."""
+        added = 0
+        for business in businesses:
+            key = business.get("id") or (
+                business.get("name"),
+                str(business.get("location")),
+            )
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            self._arrivals += 1
+            item = (
+                business.get("rating") or 0,
+                business.get("review_count") or 0,
+                -self._arrivals,
+                business,
+            )
+            if len(self._heap) < self.maxsize:
+                heapq.heappush(self._heap, item)
+            else:
+                heapq.heappushpop(self._heap, item)
+            added += 1
+        return added
+
+    def ranked(self):
+        """Return the kept businesses, best first."""
+        return [item[-1] for item in sorted(self._heap, reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+@tool(args_schema=RestaurantSearchToolInput, response_format="content_and_artifact")
 def restaurant_search(cuisine, location, price_tiers, limit=5):
     """Search for restaurants using the Yelp API based on specified criteria.
 
@@ -60,28 +133,243 @@ def restaurant_search(cuisine, location, price_tiers, limit=5):
     Args:
         cuisine (str): The search cuisine to look for restaurants (e.g., 'japanese', 'indian',
                       'italian', 'mexican'). This is used to filter businesses by category,
-                      name, or cuisine type.
+                      name, or cuisine type. Several comma-separated cuisines are searched
+                      separately and merged into one ranked list.
         location (str): The geographic location to search in. Can be a city name,
                        address, zip code, or coordinates (e.g., "New York, NY",
                        "10001", "Times Square").
         price_tiers (str): The price tier preference for restaurants. Should be a key that
                     maps to Yelp's price scale in the price_tiers configuration.
                     Options: 'cheap', 'moderate', 'expensive', 'very expensive'
-        limit (int, optional): Maximum number of restaurant results to return.
-                              Defaults to 5. Maximum allowed by Yelp API is typically 50.
+        limit (int, optional): Maximum number of restaurant results per cuisine.
+                              Defaults to 5. Results beyond one page
+                              (`YELP_PAGE_SIZE`) are fetched page by page, up to
+                              `YELP_MAX_RESULTS`.
 
     Returns:
-        list[dict]: A list of restaurant business objects from Yelp API. Each dictionary
-                   contains restaurant details such as:
+        tuple[str, list[dict]]: The model receives compact JSON with up to
+                   `TOOL_RESULT_MAX_ITEMS` restaurants, each containing:
                    - name: Restaurant name
                    - rating: Average rating
+                   - review_count: Number of reviews
                    - price: Price tier
-                   - location: Address information
-                   - phone: Contact number
-                   - url: Yelp page URL
-                   - categories: List of cuisine/category types
-                   Returns empty list if no businesses are found.
+                   - address: Street address and city
+                   - cuisine: Cuisine/category types
+                   The full Yelp business objects (coordinates, phone, images, ...)
+                   are attached to the `ToolMessage` as its artifact for the UI.
+                   Results are de-duplicated and ranked by rating and review count.
+                   Returns an empty list if no businesses are found.
     """
+    write = _progress_writer()
+    with span("tool", tool="restaurant_search") as current:
+        businesses = []
+        for businesses in iter_ranked_results(cuisine, location, price_tiers, limit):
+            write(_progress_event(cuisine, location, businesses))
+        current.set("results", len(businesses))
+    return project_restaurants(businesses), businesses
+
+
+async def arestaurant_search(cuisine, location, price_tiers, limit=5):
+    """Async implementation of `restaurant_search` using the pooled `httpx` client."""
+    write = _progress_writer()
+    with span("tool", tool="restaurant_search") as current:
+        businesses = []
+        async for businesses in aiter_ranked_results(
+            cuisine, location, price_tiers, limit
+        ):
+            write(_progress_event(cuisine, location, businesses))
+        current.set("results", len(businesses))
+    return project_restaurants(businesses), businesses
+
+
+# Native coroutine used by `ainvoke`/`astream`, so parallel searches in one
+# AIMessage run concurrently on the event loop instead of in worker threads.
+restaurant_search.coroutine = arestaurant_search
+
+
+def iter_search_pages(cuisine, location, price_tiers, limit=5):
+    """
+    Yield pages of Yelp businesses as they arrive.
+
+    Every comma-separated cuisine is its own offset-paged search of up to
+    ``limit`` results. The searches run concurrently on a small thread pool,
+    so a comparison costs about its slowest search rather than the sum, and
+    each page is yielded as soon as it comes in.
+    """
+    requests_ = _search_requests(cuisine, location, price_tiers, limit)
+    if len(requests_) == 1:
+        yield from (page for page in _search_pages(requests_[0]) if page)
+        return
+
+    arrivals = queue.Queue()
+
+    def drain(request):
+        try:
+            for page in _search_pages(request):
+                arrivals.put(page)
+        except Exception as e:
+            arrivals.put(e)
+        else:
+            arrivals.put(None)
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(len(requests_), _MAX_PARALLEL_SEARCHES),
+        thread_name_prefix="yelp_search",
+    )
+    for request in requests_:
+        # Each search gets its own context copy, so its spans nest under the tool call.
+        executor.submit(contextvars.copy_context().run, drain, request)
+    try:
+        remaining = len(requests_)
+        while remaining:
+            item = arrivals.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            elif item:
+                yield item
+    finally:
+        # Don't hold the caller up on searches nobody is waiting for any more.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_search_pages(cuisine, location, price_tiers, limit=5):
+    """Async counterpart of `iter_search_pages`; the searches run as concurrent tasks."""
+    arrivals = asyncio.Queue()
+
+    async def drain(request):
+        try:
+            async for page in _asearch_pages(request):
+                await arrivals.put(page)
+        except Exception as e:
+            await arrivals.put(e)
+        else:
+            await arrivals.put(None)
+
+    tasks = [
+        asyncio.create_task(drain(request))
+        for request in _search_requests(cuisine, location, price_tiers, limit)
+    ]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await arrivals.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            elif item:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def iter_ranked_results(cuisine, location, price_tiers, limit=5):
+    """Yield the de-duplicated, ranked results so far after every page that adds any."""
+    ranked = RankedBusinesses(limit * len(_cuisines(cuisine)))
+    for page in iter_search_pages(cuisine, location, price_tiers, limit):
+        if ranked.add(page):
+            yield ranked.ranked()
+
+
+async def aiter_ranked_results(cuisine, location, price_tiers, limit=5):
+    """Async counterpart of `iter_ranked_results`."""
+    ranked = RankedBusinesses(limit * len(_cuisines(cuisine)))
+    async for page in aiter_search_pages(cuisine, location, price_tiers, limit):
+        if ranked.add(page):
+            yield ranked.ranked()
+
+
+def _progress_writer():
+    # Outside a graph run (e.g. calling the tool directly) there is no stream.
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda chunk: None
+
+
+def _progress_event(cuisine, location, businesses):
+    return {
+        "type": PROGRESS_EVENT,
+        "query": f"{cuisine} in {location}",
+        "businesses": businesses,
+    }
+
+
+def _search_pages(request):
+    base_url, headers, params, timeout = request
+    for page_params in _page_params(params):
+
+        def search(page_params=page_params):
+            response = request_with_retry(
+                lambda: http_get(
+                    base_url, params=page_params, headers=headers, timeout=timeout
+                ),
+                upstream="yelp",
+            )
+            return _parse_search_response(response)
+
+        businesses, total = _search_flight.do(_flight_key(page_params), search)
+        yield businesses
+        if _last_page(page_params, businesses, total):
+            return
+
+
+async def _asearch_pages(request):
+    base_url, headers, params, timeout = request
+    for page_params in _page_params(params):
+
+        async def search(page_params=page_params):
+            response = await arequest_with_retry(
+                lambda: ahttp_get(
+                    base_url, params=page_params, headers=headers, timeout=timeout
+                ),
+                upstream="yelp",
+            )
+            return _parse_search_response(response)
+
+        businesses, total = await _search_flight.ado(_flight_key(page_params), search)
+        yield businesses
+        if _last_page(page_params, businesses, total):
+            return
+
+
+def _page_params(params):
+    settings = get_settings()
+    limit = min(params["limit"], settings.yelp_max_results)
+    for offset in range(0, limit, settings.yelp_page_size):
+        yield {
+            **params,
+            "limit": min(settings.yelp_page_size, limit - offset),
+            "offset": offset,
+        }
+
+
+def _last_page(page_params, businesses, total):
+    return len(businesses) < page_params["limit"] or (
+        total is not None and page_params["offset"] + len(businesses) >= total
+    )
+
+
+def _flight_key(params):
+    return tuple(
+        sorted((k, " ".join(str(v).casefold().split())) for k, v in params.items())
+    )
+
+
+def _cuisines(cuisine):
+    return [c.strip() for c in cuisine.split(",") if c.strip()] or [cuisine]
+
+
+def _search_requests(cuisine, location, price_tiers, limit):
+    return [
+        _search_request(c, location, price_tiers, limit) for c in _cuisines(cuisine)
+    ]
+
+
+def _search_request(cuisine, location, price_tiers, limit):
     api_key, base_url, price_tiers_mpping, timeout = get_yelp_cache_data()
 
     headers = {"Authorization": f"Bearer {api_key}"}
@@ -93,13 +381,15 @@ def restaurant_search(cuisine, location, price_tiers, limit=5):
             price_tiers, "2"
         ),  # Changed default from "3" to "2" (moderate)
     }
+    return base_url, headers, params, timeout
 
-    response = requests.get(base_url, headers=headers, params=params, timeout=timeout)
 
+def _parse_search_response(response):
     if response.status_code != requests.codes.ok:
         raise Exception(
             f"Error fetching data from Yelp API: {response.status_code} - {response.text}"
         )
 
-    response.raise_for_status()
-    return response.json().get("businesses", [])
+    body = response.json()
+    businesses = body.get("businesses", [])
+    return businesses, body.get("total")